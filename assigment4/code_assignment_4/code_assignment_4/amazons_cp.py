@@ -1,164 +1,10 @@
+import os
 import sys
-from pycsp3 import *
 
-
-def read_instance(filename: str) -> (int, list[(int, int)]):
-    """
-    Read the given instance file
-    :param filename: the path to the instance file
-    :return: a tuple containing the length/width of the chessboard and a list
-    of (i, j) tuples containing the position of the forced amazons where i is the row index and j is the column index
-    """
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-    size, placed_amazon_nbr = [int(x) for x in lines[0].strip().split(" ")]
-    placed_amazons = []
-    for i in range(1, placed_amazon_nbr + 1):
-        column, row = [int(x) for x in lines[i].strip().split(" ")]
-        placed_amazons.append((column, row))
-    return size, placed_amazons
-
-
-def verify_line(line: list[int]) -> bool:
-    """
-    Check that a line contains at most one amazon
-    :param line: the line to check
-    :return: True iff the line contains at most one amazon
-    """
-    has_amazon = False
-    for i in range(len(line)):
-        if has_amazon and line[i] == 1:
-            return False
-        if not has_amazon and line[i] == 1:
-            has_amazon = True
-    return True
-
-
-def verify_diagonals(grid : list[list[int]], index_ref: (int, int)) -> bool:
-    """
-    Check that an amazon has no conflict with another amazon on its diagonal
-    :param grid: the solution
-    :param index_ref: the position of the amazon
-    :return: True iff there is no other amazon on the diagonal
-    """
-    for i in range(1, len(grid)):
-        if index_ref[0] - i >= 0 and index_ref[1] - i >= 0:
-            if grid[index_ref[0] - i][index_ref[1] - i] == 1:
-                return False
-
-        if index_ref[0] + i < len(grid) and index_ref[1] - i >= 0:
-            if grid[index_ref[0] + i][index_ref[1] - i] == 1:
-                return False
-
-        if index_ref[0] - i >= 0 and index_ref[1] + i < len(grid):
-            if grid[index_ref[0] - i][index_ref[1] + i] == 1:
-                return False
-
-        if index_ref[0] + i < len(grid) and index_ref[1] + i < len(grid):
-            if grid[index_ref[0] + i][index_ref[1] + i] == 1:
-                return False
-    return True
-
-
-def verify_3_2_moves(grid : list[list[int]], index_ref: (int, int)) -> bool:
-    """
-    Check that an amazon has no conflict with another amazon on its 3x2 moves
-    :param grid: the solution
-    :param index_ref: the position of the amazon
-    :return: True iff there is no other amazon on the diagonal
-    """
-    valid = True
-    tests = [(index_ref[0] - 3, index_ref[1] - 2),
-             (index_ref[0] - 3, index_ref[1] + 2),
-             (index_ref[0] + 3, index_ref[1] - 2),
-             (index_ref[0] + 3, index_ref[1] + 2),
-             (index_ref[0] - 2, index_ref[1] - 3),
-             (index_ref[0] - 2, index_ref[1] + 3),
-             (index_ref[0] + 2, index_ref[1] - 3),
-             (index_ref[0] + 2, index_ref[1] + 3)]
-
-    for test in tests:
-        if 0 <= test[0] < len(grid) and 0 <= test[1] < len(grid):
-            if grid[test[0]][test[1]] == 1:
-                print("3x2 conflict between ({}, {}) and ({}, {})".format(index_ref[0], index_ref[1], test[0], test[1]))
-                valid = False
-
-    return valid
-
-
-def verify_4_1_moves(grid: list[list[int]], index_ref: (int, int)) -> bool:
-    """
-    Check that an amazon has no conflict with another amazon on its 4x1 moves
-    :param grid: the solution
-    :param index_ref: the position of the amazon
-    :return: True iff there is no other amazon on the diagonal
-    """
-    valid = True
-    tests = [(index_ref[0] - 4, index_ref[1] - 1),
-             (index_ref[0] - 4, index_ref[1] + 1),
-             (index_ref[0] + 4, index_ref[1] - 1),
-             (index_ref[0] + 4, index_ref[1] + 1),
-             (index_ref[0] - 1, index_ref[1] - 4),
-             (index_ref[0] - 1, index_ref[1] + 4),
-             (index_ref[0] + 1, index_ref[1] - 4),
-             (index_ref[0] + 1, index_ref[1] + 4)]
-
-    for test in tests:
-        if 0 <= test[0] < len(grid) and 0 <= test[1] < len(grid):
-            if grid[test[0]][test[1]] == 1:
-                print("4x1 conflict between ({}, {}) and ({}, {})".format(index_ref[0], index_ref[1], test[0], test[1]))
-                valid = False
-    return valid
-
-
-def verify_n_amazons(grid : list[list[int]], placed_amazons):
-    """
-    Check the validity of the solution
-    :param grid: the solution to check
-    :param placed_amazons: the set of placed amazons defined by the instance
-    :return: True iff the solution is valid
-    """
-    valid = True
-
-    for amazon in placed_amazons:
-        if grid[amazon[0]][amazon[1]] != 1:
-            valid = False
-            print("Forced amazon at position ({}, {}) is missing".format(amazon[0], amazon[1]))
-
-    for i in range(len(grid)):
-        line = grid[i]
-        if not verify_line(line):
-            valid = False
-            print("Line {} contains several amazons".format(i))
-
-        column = [grid[j][i] for j in range(len(grid))]
-        if not verify_line(column):
-            valid = False
-            print("Column {} contains several amazons".format(i))
-
-    nbr_amazons = 0
-    for i in range(len(grid)):
-        for j in range(len(grid)):
-            if grid[i][j] == 1:
-                nbr_amazons += 1
-
-                if not verify_diagonals(grid, (i, j)):
-                    valid = False
-                    print("Diagonals of amazon at position ({}, {}) contains other amazons".format(i, j))
-                if not verify_3_2_moves(grid, (i, j)):
-                    valid = False
-                if not verify_4_1_moves(grid, (i, j)):
-                    valid = False
-
-    if nbr_amazons < len(grid):
-        valid = False
-        print("Some amazons are missing")
-
-    if nbr_amazons > len(grid):
-        valid = False
-        print("There are too many amazons")
-
-    return valid
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'amazons_propositional_logic'))
+from feasibility import check_feasibility, print_infeasibility
+from geometry import JUMP_MOVES
+from solve import read_instance, verify_n_amazons
 
 
 def amazons_cp(size: int, placed_amazons: list[(int, int)]) -> (bool, list[list[int]]):
@@ -170,11 +16,25 @@ def amazons_cp(size: int, placed_amazons: list[(int, int)]) -> (bool, list[list[
     and output is 2D grid representing the solution: output[i][j] == 1 iff there is an amazon at row i and column j
     otherwise output[i][j] == 0
     """
+    # pycsp3 is only imported when a model is built, it takes longer to import than to solve small instances
+    from pycsp3 import AllDifferent, CHOCO, SAT, VarArray, abs, clear, satisfy, solve, values
 
-    # Create the variables here
+    # x[i] is the column of the amazon placed on row i
+    x = VarArray(size=size, dom=range(size))
 
     satisfy(
-        # Write your constraints here
+        # At most one amazon per column
+        AllDifferent(x),
+
+        # At most one amazon per diagonal
+        AllDifferent(x[i] + i for i in range(size)),
+        AllDifferent(x[i] - i for i in range(size)),
+
+        # No amazon attacks another one with a 3x2 or 4x1 move
+        [abs(x[i] - x[i + dr]) != dc for dr, dc in JUMP_MOVES if dc > 0 for i in range(size - dr)],
+
+        # The forced amazons are on the chessboard
+        [x[row] == col for row, col in placed_amazons]
     )
 
     # output[i][j] == 1 iff there is an amazon at row i and column j
@@ -185,6 +45,8 @@ def amazons_cp(size: int, placed_amazons: list[(int, int)]) -> (bool, list[list[
     if solve(solver=CHOCO) is SAT:
         status = True
         # Fill the output grid with solution
+        for row, col in enumerate(values(x)):
+            output[row][col] = 1
     else:
         status = False
 
@@ -196,9 +58,72 @@ def amazons_cp(size: int, placed_amazons: list[(int, int)]) -> (bool, list[list[
     return status, output
 
 
+def amazons_cp_max(size: int, placed_amazons: list[(int, int)]) -> (int, list[list[int]]):
+    """
+    Place as many non-attacking amazons as possible using Constraint Programming
+    :param size: the width/length of the chessboard
+    :param placed_amazons: a list of the already placed amazons represented by a tuple (row, column)
+    :return: a tuple (count, output) where count is the maximum number of amazons and output[i][j] == 1
+    iff there is an amazon at row i and column j in a placement of count amazons,
+    count is None if the forced amazons attack each other
+    """
+    from pycsp3 import CHOCO, OPTIMUM, SAT, Sum, VarArray, clear, maximize, satisfy, solve, values
+
+    # b[i][j] == 1 iff there is an amazon at row i and column j, a row may be empty
+    b = VarArray(size=[size, size], dom={0, 1})
+
+    satisfy(
+        # At most one amazon per row and per column
+        [Sum(b[i]) <= 1 for i in range(size)],
+        [Sum(b[i][j] for i in range(size)) <= 1 for j in range(size)],
+
+        # At most one amazon per diagonal
+        [Sum(b[i][i - d] for i in range(max(d, 0), min(size, size + d))) <= 1 for d in range(2 - size, size - 1)],
+        [Sum(b[i][d - i] for i in range(max(d - size + 1, 0), min(size, d + 1))) <= 1 for d in range(1, 2 * size - 2)],
+
+        # No amazon attacks another one with a 3x2 or 4x1 move
+        [b[i][j] + b[i + dr][j + dc] <= 1 for i in range(size) for j in range(size)
+         for dr, dc in JUMP_MOVES
+         if i + dr < size and 0 <= j + dc < size],
+
+        # The forced amazons are on the chessboard
+        [b[row][col] == 1 for row, col in placed_amazons]
+    )
+
+    maximize(Sum(b))
+
+    count, output = None, None
+    status = solve(solver=CHOCO)
+    if status is OPTIMUM or status is SAT:
+        output = [list(row) for row in values(b)]
+        count = sum(map(sum, output))
+
+    clear()
+    return count, output
+
+
 if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3) or len(sys.argv) == 3 and sys.argv[2] != "--max":
+        print("Usage:", sys.argv[0], "INSTANCE_FILE [--max]", file=sys.stderr)
+        exit(1)
     instance_file = sys.argv[1]
     size, placed_amazons = read_instance(instance_file)
+    if len(sys.argv) == 3:
+        # pycsp3 parses the command line when it is imported, it must not see the options of this script
+        sys.argv = sys.argv[:1]
+        count, solution = amazons_cp_max(size, placed_amazons)
+        if count is None:
+            print("The forced amazons attack each other")
+            exit(0)
+        print("At most {} amazons can be placed".format(count))
+        for line in solution:
+            print(line)
+        exit(0)
+    feasible, conflicts, empty_rows, empty_columns = check_feasibility(size, placed_amazons)
+    if not feasible:
+        print_infeasibility(conflicts, empty_rows, empty_columns)
+        print("No solution found")
+        exit(0)
     status, solution = amazons_cp(size, placed_amazons)
     if status:
         print("Solution found")
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Front-end choosing between the SAT (MiniSat) and CP (pycsp3/Choco) backends for each N-amazons instance.
+
+Cheap features are extracted from the instance (size, number and spread of the forced amazons,
+empty chessboard or not) and compared with a benchmark history stored as JSON lines: the solving
+time of each backend is predicted as the mean time of its k nearest instances in the history,
+and the backend with the lowest prediction is run first. If it does not answer within the timeout,
+it is stopped and the other backend is run. Every run is appended to the history, so that
+the predictions improve over time.
+
+Usage:
+amazons_dispatch.py INSTANCE_FILE [--timeout SECONDS] [--history FILE]
+amazons_dispatch.py --benchmark INSTANCE_FILE... [--timeout SECONDS] [--history FILE]
+
+The history file is ./tmp/benchmark_history.jsonl in the working directory by default.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+SAT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'amazons_propositional_logic')
+sys.path.insert(0, SAT_DIR)
+
+from feasibility import check_feasibility, print_infeasibility
+from solve import read_instance, verify_n_amazons
+
+BACKENDS = ['sat', 'cp']
+# Like the files of MiniSat, the history is kept in the ./tmp directory of the working directory
+DEFAULT_HISTORY = os.path.join('tmp', 'benchmark_history.jsonl')
+
+
+def instance_features(size: int, placed_amazons: list[(int, int)]) -> dict:
+    """
+    Extract the features of an instance used to predict the fastest backend
+    :param size: the width/length of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :return: a dictionary of features
+    """
+    n_placed = len(placed_amazons)
+    spread = 0.0
+    if n_placed > 1:
+        # Mean distance of the forced amazons to their barycenter, relative to the size of the chessboard
+        mean_row = sum(row for row, _ in placed_amazons) / n_placed
+        mean_col = sum(col for _, col in placed_amazons) / n_placed
+        spread = sum(math.hypot(row - mean_row, col - mean_col) for row, col in placed_amazons) / n_placed / size
+    return {'size': size, 'n_placed': n_placed, 'density': n_placed / size, 'spread': spread,
+            'empty': n_placed == 0}
+
+
+def feature_distance(features1: dict, features2: dict) -> float:
+    """
+    Distance between the features of two instances, the size being compared on a log scale
+    """
+    return math.sqrt((math.log2(features1['size']) - math.log2(features2['size'])) ** 2
+                     + (features1['density'] - features2['density']) ** 2
+                     + (features1['spread'] - features2['spread']) ** 2
+                     + (features1['empty'] != features2['empty']))
+
+
+def read_history(history_file: str) -> list[dict]:
+    """
+    Read the benchmark history, one JSON record per line
+    """
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file, 'r') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def append_history(history_file: str, record: dict):
+    if os.path.dirname(history_file):
+        os.makedirs(os.path.dirname(history_file), exist_ok=True)
+    with open(history_file, 'a') as file:
+        file.write(json.dumps(record) + '\n')
+
+
+def record_time(record: dict, timeout: float) -> float:
+    """
+    Time of a run used by the prediction: a run stopped by the timeout counts as twice its time, and a crash
+    as twice the timeout, so that a backend failing quickly is not predicted to be the fastest
+    """
+    if record.get('crashed'):
+        return 2 * timeout
+    return 2 * record['time'] if record['timed_out'] else record['time']
+
+
+def predict_times(features: dict, history: list[dict], timeout: float = 60, k: int = 5) -> dict:
+    """
+    Predict the solving time of each backend as the mean time of its k nearest instances in the history
+    :param timeout: the timeout of the runs, used as the penalty of the crashes (see record_time)
+    :return: a dictionary backend -> predicted time, None if the backend has no history
+    """
+    predictions = {}
+    for backend in BACKENDS:
+        records = sorted((r for r in history if r['backend'] == backend),
+                         key=lambda r: feature_distance(features, r['features']))[:k]
+        if records:
+            predictions[backend] = sum(record_time(r, timeout) for r in records) / len(records)
+        else:
+            predictions[backend] = None
+    return predictions
+
+
+def choose_backend(features: dict, history: list[dict], timeout: float = 60) -> str:
+    """
+    Choose the backend predicted to be the fastest, a backend without history is tried first
+    """
+    predictions = predict_times(features, history, timeout)
+    for backend in BACKENDS:
+        if predictions[backend] is None:
+            return backend
+    return min(BACKENDS, key=lambda backend: predictions[backend])
+
+
+def _run_backend(backend: str, size: int, placed_amazons: list[(int, int)], queue):
+    """
+    Solve an instance with a backend, in a separate process so that it can be stopped on timeout
+    The result (SAT, grid) is put in the queue
+    """
+    if backend == 'sat':
+        # MiniSat works in the ./tmp directory of the caller, its executable is found through an absolute path
+        os.makedirs('tmp', exist_ok=True)
+        import minisat
+        from amazons_sat import count_clauses, iter_literals
+        from solve import get_grid_from_solution, minisat_executable
+        executable = minisat_executable()
+        is_sat, solution = minisat.minisat_stream(size * size, count_clauses(size, len(placed_amazons)),
+                                                  iter_literals(size, placed_amazons), executable, as_array=True)
+        queue.put((is_sat, get_grid_from_solution(solution, size).tolist() if is_sat else None))
+    else:
+        # pycsp3 parses the command line when it is imported, it must not see the options of this script
+        sys.argv = sys.argv[:1]
+        from amazons_cp import amazons_cp
+        queue.put(amazons_cp(size, placed_amazons))
+
+
+def run_backend(backend: str, size: int, placed_amazons: list[(int, int)],
+                timeout: float = None) -> (bool, list[list[int]], float, str):
+    """
+    Run a backend with a timeout
+    :return: a tuple (SAT, grid, time, failure) where failure is None if the backend answered,
+    'timeout' if it has been stopped by the timeout and 'crash' if it ended without answering,
+    SAT and grid being None on a failure
+    """
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_backend, args=(backend, size, placed_amazons, results))
+    start = time.perf_counter()
+    process.start()
+    while True:
+        try:
+            is_sat, grid = results.get(timeout=0.05)
+            break
+        except queue.Empty:
+            timed_out = timeout is not None and time.perf_counter() - start > timeout
+            if timed_out or not process.is_alive():
+                # The result may have been sent just before the process ended
+                try:
+                    is_sat, grid = results.get_nowait()
+                    break
+                except queue.Empty:
+                    process.terminate()
+                    process.join()
+                    return None, None, time.perf_counter() - start, 'timeout' if timed_out else 'crash'
+    elapsed = time.perf_counter() - start
+    process.join()
+    return is_sat, grid, elapsed, None
+
+
+def dispatch(size: int, placed_amazons: list[(int, int)], timeout: float = 60,
+             history_file: str = DEFAULT_HISTORY, check: bool = True) -> (bool, list[list[int]], str):
+    """
+    Solve an instance with the backend predicted to be the fastest, falling back to the other one on timeout
+    :param size: the width/length of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :param timeout: the time in seconds given to the first backend
+    :param history_file: the benchmark history used for the prediction, completed with the new runs
+    :param check: run check_feasibility first, False if the caller has already run it
+    :return: a tuple (SAT, grid, backend) where backend is the backend that answered,
+    'feasibility' if the instance has been found UNSAT before calling any backend
+    """
+    if check and not check_feasibility(size, placed_amazons)[0]:
+        return False, None, 'feasibility'
+    features = instance_features(size, placed_amazons)
+    first = choose_backend(features, read_history(history_file), timeout)
+    for backend, backend_timeout in ((first, timeout), (BACKENDS[1 - BACKENDS.index(first)], None)):
+        is_sat, grid, elapsed, failure = run_backend(backend, size, placed_amazons, backend_timeout)
+        append_history(history_file, {'features': features, 'backend': backend, 'time': elapsed,
+                                      'timed_out': failure == 'timeout', 'crashed': failure == 'crash'})
+        if failure is None:
+            return is_sat, grid, backend
+    return None, None, None
+
+
+def benchmark(instance_files: list[str], timeout: float = 60, history_file: str = DEFAULT_HISTORY):
+    """
+    Run both backends on each instance to fill the benchmark history
+    """
+    for instance_file in instance_files:
+        size, placed_amazons = read_instance(instance_file)
+        features = instance_features(size, placed_amazons)
+        for backend in BACKENDS:
+            _, _, elapsed, failure = run_backend(backend, size, placed_amazons, timeout)
+            append_history(history_file, {'features': features, 'backend': backend, 'time': elapsed,
+                                          'timed_out': failure == 'timeout', 'crashed': failure == 'crash'})
+            print("{} {}: {:.3f}s{}".format(instance_file, backend, elapsed, " ({})".format(failure) if failure else ""))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Solve N-amazons instances with the fastest backend")
+    parser.add_argument('instances', nargs='+', help="the instance file(s)")
+    parser.add_argument('--timeout', type=float, default=60, help="timeout of the first backend, in seconds")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="the benchmark history file")
+    parser.add_argument('--benchmark', action='store_true', help="run both backends to fill the history")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.instances, args.timeout, args.history)
+        exit(0)
+
+    size, placed_amazons = read_instance(args.instances[0])
+    feasible, conflicts, empty_rows, empty_columns = check_feasibility(size, placed_amazons)
+    if not feasible:
+        print_infeasibility(conflicts, empty_rows, empty_columns)
+        print("The problem is UNSAT")
+        exit(0)
+    status, solution, backend = dispatch(size, placed_amazons, args.timeout, args.history, check=False)
+    if status is None:
+        print("No backend answered")
+    elif status:
+        print("Solution found by the {} backend".format(backend))
+        for line in solution:
+            print(line)
+        verify_n_amazons(solution, placed_amazons)
+    else:
+        print("No solution found by the {} backend".format(backend))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Maximum-amazons mode: place as many non-attacking amazons as possible when n of them cannot be placed.
+
+The clauses forbidding the attacks are the ones of amazons_sat, without the clauses requiring
+an amazon on each row and column. Since a row holds at most one amazon, the number of amazons
+is the number of rows holding one. A row indicator r_i implies that row i holds an amazon, and
+a totalizer over the row indicators gives the unary outputs o_1, ..., o_n where o_k implies that
+at least k rows hold an amazon. The bound is tightened by passing o_k as an assumption to a single
+incremental solver (through the python-sat package): each model found gives a new lower bound,
+and the first UNSAT call proves that the last model is optimal.
+
+Usage: amazons_max.py INSTANCE_FILE
+"""
+
+import sys
+
+import numpy as np
+from pysat.solvers import Solver
+
+from amazons_sat import iter_clauses, iter_literals
+from solve import get_grid_from_solution, read_instance
+
+
+def totalizer(inputs: list[int], next_var: int) -> (list[list[int]], list[int], int):
+    """
+    Encode the lower bounds of a totalizer over the inputs
+    Only the clauses deriving the inputs from the outputs are generated: an output may be false
+    when its bound is reached, which does not matter as the outputs are only used as assumptions
+    :param inputs: the literals to count
+    :param next_var: the first free variable
+    :return: a tuple (clauses, outputs, next_var) where outputs[k - 1] implies that at least k inputs are true
+    and next_var is the first variable still free after the encoding
+    """
+    if len(inputs) == 1:
+        return [], list(inputs), next_var
+    left_clauses, left, next_var = totalizer(inputs[:len(inputs) // 2], next_var)
+    right_clauses, right, next_var = totalizer(inputs[len(inputs) // 2:], next_var)
+    outputs = list(range(next_var, next_var + len(inputs)))
+    next_var += len(inputs)
+    clauses = left_clauses + right_clauses
+    # At most i left inputs and at most j right inputs are true: less than i + j + 1 inputs are true
+    for i in range(len(left) + 1):
+        for j in range(len(right) + 1):
+            if i + j < len(inputs):
+                clause = [-outputs[i + j]]
+                if i < len(left):
+                    clause.append(left[i])
+                if j < len(right):
+                    clause.append(right[j])
+                clauses.append(clause)
+    return clauses, outputs, next_var
+
+
+def max_amazons(size: int, placed_amazons: list[(int, int)], solver_name: str = 'minisat22') -> (int, np.ndarray):
+    """
+    Find the maximum number of non-attacking amazons that can be placed with the forced amazons
+    :param size: length/width of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :param solver_name: the name of the python-sat solver to use
+    :return: a tuple (count, grid) where grid[i][j] == 1 iff there is an amazon at row i and column j
+    in a placement of count amazons, count and grid are None if the forced amazons attack each other
+    """
+    n_vars = size * size
+    rows = list(range(n_vars + 1, n_vars + size + 1))
+    # A row indicator implies an amazon on its row
+    row_clauses = [[-rows[row]] + list(range(row * size + 1, (row + 1) * size + 1)) for row in range(size)]
+    card_clauses, bounds, _ = totalizer(rows, n_vars + size + 1)
+
+    with Solver(name=solver_name) as solver:
+        for chunk in iter_literals(size, placed_amazons, at_least_one=False):
+            solver.append_formula(iter_clauses(chunk))
+        solver.append_formula(row_clauses)
+        solver.append_formula(card_clauses)
+
+        # The n amazons of the N-amazons problem are tried first, it is the most common answer
+        if solver.solve(assumptions=[bounds[size - 1]]):
+            return size, get_grid_from_solution(_get_placement(solver, size), size)
+        if not solver.solve():
+            return None, None
+        best = _get_placement(solver, size)
+        # Each model gives a lower bound, the first UNSAT call proves it optimal
+        while solver.solve(assumptions=[bounds[len(best)]]):
+            best = _get_placement(solver, size)
+    return len(best), get_grid_from_solution(best, size)
+
+
+def _get_placement(solver: Solver, size: int) -> np.ndarray:
+    """
+    :return: the true literals of the amazons in the model of the solver
+    """
+    model = np.array(solver.get_model()[:size * size], dtype=np.int64)
+    return model[model > 0]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage:", sys.argv[0], "INSTANCE_FILE", file=sys.stderr)
+        exit(1)
+
+    size, fixed_amazons = read_instance(sys.argv[1])
+    count, grid = max_amazons(size, fixed_amazons)
+    if count is None:
+        print("The forced amazons attack each other")
+        exit(0)
+    print("At most {} amazons can be placed".format(count))
+    for row in grid:
+        print(row.tolist())
@@ -1,3 +1,7 @@
+import numpy as np
+
+from attack_table import get_attack_table
+from geometry import JUMP_MOVES
 from clause import *
 
 """
@@ -33,7 +37,6 @@ X_0_0 is the literal representing the top left corner of the chessboard
 
 
 
-
 def get_expression(size: int, placed_amazons: list[(int, int)]) -> list[Clause]:
     """
     Defines the clauses for the N-amazons problem
@@ -41,66 +44,148 @@ def get_expression(size: int, placed_amazons: list[(int, int)]) -> list[Clause]:
     :param placed_amazons: a list of the already placed amazons
     :return: a list of clauses
     """
+    return list(iter_expression(size, placed_amazons))
 
-    expression = []
 
-    # Contrainte : Chaque ligne doit avoir exactement une amazone
+def iter_expression(size: int, placed_amazons: list[(int, int)]):
+    """
+    Generate the clauses of get_expression one by one, without keeping them in memory
+    :param size: length/width of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :return: a generator of clauses
+    """
+
+    # Contrainte : Chaque ligne doit avoir au moins une amazone
     for row in range(size):
         clause = Clause(size)
         for col in range(size):
             clause.add_positive(row, col)
-        expression.append(clause)
+        yield clause
 
-    # Contrainte : Chaque colonne doit avoir exactement une amazone
+    # Contrainte : Chaque colonne doit avoir au moins une amazone
     for col in range(size):
         clause = Clause(size)
         for row in range(size):
             clause.add_positive(row, col)
-        expression.append(clause)
+        yield clause
+
+    # Contrainte : Au plus une amazone par ligne, par colonne, par diagonale et par anti-diagonale
+    table = get_attack_table(size)
+    for line_id in range(table.n_lines):
+        cells = table.line(line_id).tolist()
+        for i, cell1 in enumerate(cells):
+            for cell2 in cells[i + 1:]:
+                clause = Clause(size)
+                clause.add_negative(*divmod(cell1, size))
+                clause.add_negative(*divmod(cell2, size))
+                yield clause
 
-    # Contrainte : Aucune nouvelle amazone sur une case déjà occupée
+    # Contrainte : Aucune menace par un déplacement 3x2 ou 4x1
+    for cell1, cell2 in zip(*(cells.tolist() for cells in table.forward_jumps())):
+        clause = Clause(size)
+        clause.add_negative(*divmod(cell1, size))
+        clause.add_negative(*divmod(cell2, size))
+        yield clause
+
+    # Contrainte : Les amazones déjà placées sont sur l'échiquier
     for amazon in placed_amazons:
         row, col = amazon
         clause = Clause(size)
-        clause.add_negative(row, col)
-        expression.append(clause)
+        clause.add_positive(row, col)
+        yield clause
 
-    # Contrainte : Aucune menace entre les amazones déjà placées
-    for i in range(len(placed_amazons)):
-        for j in range(i + 1, len(placed_amazons)):
-            row1, col1 = placed_amazons[i]
-            row2, col2 = placed_amazons[j]
 
-            # Aucune menace sur la même ligne, colonne ou diagonale
-            if row1 == row2 or col1 == col2 or abs(row1 - row2) == abs(col1 - col2):
-                clause = Clause(size)
-                clause.add_negative(row1, col1)
-                clause.add_negative(row2, col2)
-                expression.append(clause)
-    # Contrainte : Déplacements autorisés pour les amazones
-    for amazon in placed_amazons:
-        row, col = amazon
+def count_clauses(size: int, n_placed_amazons: int) -> int:
+    """
+    Compute the number of clauses generated by get_expression without generating them
+    :param size: length/width of the chessboard
+    :param n_placed_amazons: the number of already placed amazons
+    :return: the number of clauses
+    """
+    lines = 2 * size + size * size * (size - 1)
+    diagonals = 2 * sum((size - distance) ** 2 for distance in range(1, size))
+    jumps = sum(max(size - dr, 0) * max(size - abs(dc), 0) for dr, dc in JUMP_MOVES)
+    return lines + diagonals + jumps + n_placed_amazons
+
+
+def get_literals(size: int, placed_amazons: list[(int, int)]) -> (np.ndarray, int):
+    """
+    Vectorized version of get_expression for large chessboards.
+    The clauses are the same, in the same order, but the conflicting pairs are taken as arrays
+    from the attack table of the chessboard, and the clauses are written in a single flat buffer
+    in the MiniSAT format: the literals of each clause followed by a 0.
+    :param size: length/width of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :return: a tuple (literals, n_clauses) where literals is the flat buffer
+    and n_clauses is the number of clauses it contains
+    """
+    literals = np.concatenate(list(iter_literals(size, placed_amazons)))
+    return literals, count_clauses(size, len(placed_amazons))
 
-        # Déplacement 3x2
-        for dr in [-3, 3]:
-            for dc in [-2, 2]:
-                new_row, new_col = row + dr, col + dc
-                if 0 <= new_row < size and 0 <= new_col < size:
-                    clause = Clause(size)
-                    clause.add_negative(row, col)
-                    clause.add_positive(new_row, new_col)
-                    expression.append(clause)
-
-        # Déplacement 4x1
-        for dr in [-4, 4]:
-            for dc in [-1, 1]:
-                new_row, new_col = row + dr, col + dc
-                if 0 <= new_row < size and 0 <= new_col < size:
-                    clause = Clause(size)
-                    clause.add_negative(row, col)
-                    clause.add_positive(new_row, new_col)
-                    expression.append(clause)
-
-
-    return expression
 
+def iter_literals(size: int, placed_amazons: list[(int, int)], at_least_one: bool = True):
+    """
+    Generate the flat buffer of get_literals chunk by chunk, each chunk holding O(size^2) literals,
+    so that the whole encoding never has to be kept in memory
+    :param size: length/width of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :param at_least_one: generate the clauses requiring an amazon on each row and column,
+    without them the clauses only forbid the attacks (2 * size clauses less than count_clauses)
+    :return: a generator of flat buffers of 0-terminated clauses
+    """
+    placed = np.asarray(placed_amazons, dtype=np.int64).reshape(-1, 2)
+    if placed.size and (placed.min() < 0 or placed.max() >= size):
+        raise ValueError("Placed amazons are outside of the", size, "x", size, "chessboard")
+
+    # var[row][col] is the 1D index of X_row_col in the MiniSAT format
+    var = np.arange(1, size * size + 1, dtype=np.int64).reshape(size, size)
+
+    # Au moins une amazone par ligne, puis par colonne
+    if at_least_one:
+        yield _terminate(var)
+        yield _terminate(var.T)
+
+    # Au plus une amazone par ligne, par colonne, par diagonale et par anti-diagonale
+    table = get_attack_table(size)
+    for line_id in range(table.n_lines):
+        cells = table.line(line_id)
+        if len(cells) > 1:
+            first, second = np.triu_indices(len(cells), 1)
+            yield _terminate(_pairs(-1 - cells[first], -1 - cells[second]))
+
+    # Aucune menace par un déplacement 3x2 ou 4x1
+    first, second = table.forward_jumps()
+    yield _terminate(_pairs(-1 - first, -1 - second))
+
+    # Les amazones déjà placées sont sur l'échiquier
+    yield _terminate(var[placed[:, 0], placed[:, 1]][:, None])
+
+
+def iter_clauses(literals: np.ndarray):
+    """
+    Split a flat buffer of 0-terminated clauses, as returned by get_literals, into clauses
+    :param literals: the flat buffer
+    :return: a generator of lists of literals
+    """
+    clause = []
+    for literal in literals.tolist():
+        if literal == 0:
+            yield clause
+            clause = []
+        else:
+            clause.append(literal)
+
+
+def _pairs(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Stack two arrays of literals into an array of binary clauses, one clause per row
+    """
+    return np.stack([first.ravel(), second.ravel()], axis=1)
+
+
+def _terminate(clauses: np.ndarray) -> np.ndarray:
+    """
+    Flatten an array of clauses having the same length, one clause per row,
+    adding the 0 that ends each clause in the MiniSAT format
+    """
+    return np.hstack([clauses, np.zeros((len(clauses), 1), dtype=np.int64)]).ravel()
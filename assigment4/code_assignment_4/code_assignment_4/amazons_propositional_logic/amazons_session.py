@@ -0,0 +1,120 @@
+"""
+Incremental solving session for the N-amazons problem.
+
+The encoding of the empty chessboard is loaded once in a live MiniSat solver (through the
+python-sat package), and the forced amazons are given to each call as assumptions instead of
+unit clauses. Adding or removing a forced amazon therefore does not require to encode the
+chessboard again, and the clauses learnt by the solver are kept from one query to the next.
+
+Example:
+
+with AmazonsSession(25) as session:
+    session.place(0, 0)
+    session.place(1, 5)
+    is_sat, grid = session.solve()
+    session.remove(1, 5)
+    is_sat, grid = session.solve()
+
+When the problem is UNSAT, explain returns a minimal set of forced amazons that cannot be placed together.
+The literal of each forced amazon is its selector: the solver returns the assumptions it used to prove
+the problem UNSAT, and this core is shrunk by removing one amazon at a time, still in the same solver.
+"""
+
+import numpy as np
+from pysat.solvers import Solver
+
+from amazons_sat import get_literals, iter_clauses
+from solve import get_grid_from_solution, get_val_from_index
+
+
+class AmazonsSession:
+
+    def __init__(self, size: int, solver_name: str = 'minisat22'):
+        """
+        Encode the empty chessboard in a new incremental solver
+        :param size: the length/width of the chessboard
+        :param solver_name: the name of the python-sat solver to use
+        """
+        self.size = size
+        self.placed_amazons = []
+        literals, _ = get_literals(size, [])
+        self.solver = Solver(name=solver_name, bootstrap_with=iter_clauses(literals))
+
+    def literal(self, row_ind: int, column_ind: int) -> int:
+        """
+        Return the MiniSAT literal stating that there is an amazon at the given position
+        :param row_ind: the row index of the amazon
+        :param column_ind: the column index of the amazon
+        """
+        if 0 <= row_ind < self.size and 0 <= column_ind < self.size:
+            return row_ind * self.size + column_ind + 1
+        else:
+            raise ValueError("Indices : row_ind =", row_ind, "column_ind =", column_ind, "are incorrect")
+
+    def place(self, row_ind: int, column_ind: int):
+        """
+        Force an amazon at the given position for the next queries
+        """
+        self.literal(row_ind, column_ind)
+        if (row_ind, column_ind) not in self.placed_amazons:
+            self.placed_amazons.append((row_ind, column_ind))
+
+    def remove(self, row_ind: int, column_ind: int):
+        """
+        Remove a forced amazon previously added with place
+        """
+        if (row_ind, column_ind) not in self.placed_amazons:
+            raise ValueError("No amazon is forced at position", (row_ind, column_ind))
+        self.placed_amazons.remove((row_ind, column_ind))
+
+    def solve(self) -> (bool, np.ndarray):
+        """
+        Solve the N-amazons problem with the current forced amazons
+        :return: a tuple (SAT, grid) where SAT is true iff the problem is satisfiable
+        and grid[i][j] == 1 iff there is an amazon at row i and column j, grid is None if SAT is False
+        """
+        assumptions = [self.literal(row, column) for row, column in self.placed_amazons]
+        if not self.solver.solve(assumptions=assumptions):
+            return False, None
+        model = np.array(self.solver.get_model(), dtype=np.int64)
+        return True, get_grid_from_solution(model[model > 0], self.size)
+
+    def explain(self) -> list[(int, int)] | None:
+        """
+        Find a minimal set of forced amazons making the problem UNSAT
+        :return: None if the problem is satisfiable with the current forced amazons, otherwise a subset of them
+        that is UNSAT and becomes satisfiable as soon as any of its amazons is removed
+        (an empty list if the chessboard has no solution at all)
+        """
+        core = [self.literal(row, column) for row, column in self.placed_amazons]
+        if self.solver.solve(assumptions=core):
+            return None
+        core = self._shrink(core, self.solver.get_core())
+        i = 0
+        while i < len(core):
+            candidate = core[:i] + core[i + 1:]
+            if self.solver.solve(assumptions=candidate):
+                # The amazon is needed in the conflict
+                i += 1
+            else:
+                # The new core may also drop amazons after the i-th one
+                core = self._shrink(candidate, self.solver.get_core())
+        return [get_val_from_index(literal, self.size) for literal in core]
+
+    @staticmethod
+    def _shrink(assumptions: list[int], core: list[int] | None) -> list[int]:
+        # No core when the problem is UNSAT without any assumption
+        core = set(core or [])
+        return [literal for literal in assumptions if literal in core]
+
+    def close(self):
+        """
+        Release the solver
+        """
+        self.solver.delete()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,86 @@
+"""
+Precomputed attack table of the amazon, shared by the encoder and the cube-and-conquer split.
+The table takes O(size^2) memory, which these already pay for the clauses of the encoding: the verifier,
+the feasibility check and the local search compute the attacks from geometry in O(size) memory instead.
+
+The cells are numbered row by row: cell = row * size + col, the MiniSAT variable of a cell being cell + 1,
+and the lines as in geometry. The table of a size is built once with NumPy index arithmetic
+and kept in a cache, so that every lookup afterwards is an array access.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from geometry import ALL_JUMP_MOVES, line_ids, n_lines
+
+
+class AttackTable:
+
+    def __init__(self, size: int):
+        """
+        Build the tables of a chessboard, in O(size^2) memory
+        :param size: length/width of the chessboard
+        """
+        self.size = size
+        self.n_lines = n_lines(size)
+        n_cells = size * size
+        row, col = np.divmod(np.arange(n_cells, dtype=np.int64), size)
+
+        # line_ids[cell] contains the row, column, diagonal and anti-diagonal of the cell
+        self.line_ids = np.stack(line_ids(row, col, size), axis=1)
+        # Cells of each line, in increasing order: line_cells[line_ptr[line]:line_ptr[line + 1]]
+        ids = self.line_ids.T.ravel()
+        self.line_cells = np.tile(np.arange(n_cells, dtype=np.int64), 4)[np.argsort(ids, kind='stable')]
+        self.line_ptr = np.concatenate([[0], np.cumsum(np.bincount(ids, minlength=self.n_lines))])
+
+        # Cells a 3x2 or 4x1 move away from each cell, in the order of ALL_JUMP_MOVES:
+        # jump_cells[jump_ptr[cell]:jump_ptr[cell + 1]]
+        moves = np.array(ALL_JUMP_MOVES, dtype=np.int64)
+        new_row = row[:, None] + moves[:, 0]
+        new_col = col[:, None] + moves[:, 1]
+        inside = (0 <= new_row) & (new_row < size) & (0 <= new_col) & (new_col < size)
+        self.jump_cells = (new_row * size + new_col)[inside]
+        self.jump_ptr = np.concatenate([[0], np.cumsum(inside.sum(axis=1))])
+
+    def cell(self, row: int, col: int) -> int:
+        if 0 <= row < self.size and 0 <= col < self.size:
+            return row * self.size + col
+        raise ValueError("Indices : row_ind =", row, "column_ind =", col, "are incorrect")
+
+    def line(self, line_id: int) -> np.ndarray:
+        """
+        :return: the cells of a line
+        """
+        return self.line_cells[self.line_ptr[line_id]:self.line_ptr[line_id + 1]]
+
+    def jumps(self, cell: int) -> np.ndarray:
+        """
+        :return: the cells a 3x2 or 4x1 move away from a cell
+        """
+        return self.jump_cells[self.jump_ptr[cell]:self.jump_ptr[cell + 1]]
+
+    def attacked(self, cell: int) -> np.ndarray:
+        """
+        :return: the cells attacked by an amazon, the cell of the amazon excluded, in increasing order
+        """
+        cells = np.concatenate([self.line(line_id) for line_id in self.line_ids[cell]] + [self.jumps(cell)])
+        cells = np.unique(cells)
+        return cells[cells != cell]
+
+    def forward_jumps(self) -> (np.ndarray, np.ndarray):
+        """
+        :return: a tuple (first, second) of arrays holding each pair of cells a 3x2 or 4x1 move apart once,
+        second being on a later row than first
+        """
+        first = np.repeat(np.arange(self.size * self.size, dtype=np.int64), np.diff(self.jump_ptr))
+        forward = self.jump_cells > first
+        return first[forward], self.jump_cells[forward]
+
+
+@lru_cache(maxsize=8)
+def get_attack_table(size: int) -> AttackTable:
+    """
+    :return: the attack table of a size, built on the first call
+    """
+    return AttackTable(size)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Cube-and-conquer parallel solving of the N-amazons problem.
+
+The search space is split on the column of the amazon in a few selected rows: each cube
+places one amazon in each selected row, the cubes attacked by a forced amazon or by another
+amazon of the cube being discarded upfront. Every worker of a process pool loads the same
+base CNF once in an incremental MiniSat solver (through the python-sat package), then solves
+the cubes it receives as assumptions. The first SAT cube stops the whole pool, and the problem
+is UNSAT iff all the cubes are UNSAT.
+
+Usage: cube_and_conquer.py INSTANCE_FILE [PROCESSES]
+"""
+
+import os
+import sys
+from itertools import product
+from multiprocessing import Pool
+
+import numpy as np
+from pysat.solvers import Solver
+
+from amazons_sat import get_literals, iter_clauses
+from attack_table import get_attack_table
+from feasibility import check_feasibility, print_infeasibility
+from solve import get_grid_from_solution, read_instance, verify_n_amazons
+
+
+def select_rows(size: int, placed_amazons: list[(int, int)], n_rows: int) -> list[int]:
+    """
+    Select the rows to split on: the rows without forced amazon closest to the middle of the chessboard
+    """
+    forced_rows = {row for row, _ in placed_amazons}
+    free_rows = sorted((row for row in range(size) if row not in forced_rows), key=lambda row: abs(2 * row - size + 1))
+    return free_rows[:n_rows]
+
+
+def make_cubes(size: int, placed_amazons: list[(int, int)], rows: list[int]) -> list[list[(int, int)]]:
+    """
+    Enumerate the positions of the amazons of the selected rows that are compatible with
+    the forced amazons and with each other
+    :param size: length/width of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :param rows: the selected rows
+    :return: a list of cubes, each cube being a list of (row, column) positions, one per selected row
+    """
+    table = get_attack_table(size)
+    free = np.ones(size * size, dtype=bool)
+    for row, col in placed_amazons:
+        free[table.attacked(table.cell(row, col))] = False
+
+    cubes = [[]]
+    for row in rows:
+        candidates = (row * size + np.flatnonzero(free[row * size:(row + 1) * size])).tolist()
+        attacks = {cell: set(table.attacked(cell).tolist()) for cell in candidates}
+        cubes = [cube + [cell] for cube, cell in product(cubes, candidates)
+                 if not any(other in attacks[cell] for other in cube)]
+    return [[divmod(cell, size) for cell in cube] for cube in cubes]
+
+
+def split(size: int, placed_amazons: list[(int, int)], min_cubes: int) -> list[list[(int, int)]]:
+    """
+    Split on more and more rows until there are at least min_cubes cubes
+    """
+    n_rows = 0
+    cubes = [[]]
+    while len(cubes) < min_cubes and n_rows < size - len(placed_amazons):
+        n_rows += 1
+        cubes = make_cubes(size, placed_amazons, select_rows(size, placed_amazons, n_rows))
+    return cubes
+
+
+_solver = None
+
+
+def _init_worker(literals: np.ndarray):
+    """
+    Load the base CNF in the solver of the worker process
+    """
+    global _solver
+    _solver = Solver(name='minisat22', bootstrap_with=iter_clauses(literals))
+
+
+def _solve_cube(assumptions: list[int]) -> (bool, list[int]):
+    """
+    Solve the base CNF under the assumptions of a cube
+    :return: a tuple (SAT, model) where model is None if SAT is False
+    """
+    if _solver.solve(assumptions=assumptions):
+        return True, _solver.get_model()
+    return False, None
+
+
+def cube_and_conquer(size: int, placed_amazons: list[(int, int)], processes: int = None,
+                     min_cubes: int = None) -> (bool, np.ndarray):
+    """
+    Solve the N-amazons problem in parallel
+    :param size: length/width of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :param processes: the number of worker processes, the number of CPUs by default
+    :param min_cubes: the minimum number of cubes, 4 per process by default
+    :return: a tuple (SAT, grid) where SAT is true iff the problem is satisfiable
+    and grid[i][j] == 1 iff there is an amazon at row i and column j, grid is None if SAT is False
+    """
+    processes = processes or os.cpu_count()
+    cubes = split(size, placed_amazons, min_cubes or 4 * processes)
+    if not cubes:
+        return False, None
+
+    literals, _ = get_literals(size, placed_amazons)
+    assumptions = [[row * size + col + 1 for row, col in cube] for cube in cubes]
+    with Pool(processes, initializer=_init_worker, initargs=(literals,)) as pool:
+        for is_sat, model in pool.imap_unordered(_solve_cube, assumptions):
+            if is_sat:
+                # Leaving the with block terminates the workers still solving other cubes
+                model = np.array(model, dtype=np.int64)
+                return True, get_grid_from_solution(model[model > 0], size)
+    return False, None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage:", sys.argv[0], "INSTANCE_FILE [PROCESSES]", file=sys.stderr)
+        exit(1)
+
+    size, fixed_amazons = read_instance(sys.argv[1])
+    feasible, conflicts, empty_rows, empty_columns = check_feasibility(size, fixed_amazons)
+    if not feasible:
+        print_infeasibility(conflicts, empty_rows, empty_columns)
+        print("The problem is UNSAT")
+        exit(0)
+    processes = int(sys.argv[2]) if len(sys.argv) == 3 else None
+    is_sat, grid = cube_and_conquer(size, fixed_amazons, processes)
+
+    if not is_sat:
+        print("The problem is UNSAT")
+        exit(0)
+    print("The problem is SAT")
+    print("Solution : ")
+    for row in grid:
+        print(row.tolist())
+
+    valid = verify_n_amazons(grid, fixed_amazons)
+    if not valid:
+        print("The solution is not valid")
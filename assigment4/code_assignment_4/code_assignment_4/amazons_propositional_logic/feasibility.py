@@ -0,0 +1,70 @@
+"""
+Fast feasibility check of an N-amazons instance, run before any encoding.
+
+The check finds the forced amazons attacking each other, and the rows and columns without
+forced amazon in which every cell is attacked by a forced amazon. Both make the instance UNSAT
+without calling a solver. The cells of a row attacked by a forced amazon are computed
+arithmetically, one row at a time, so that the check takes O(size) memory and O(size * k) time
+for k forced amazons. The check is incomplete: an instance passing it may still be UNSAT.
+"""
+
+from geometry import JUMP_DISTANCES, is_attacking
+
+
+def check_feasibility(size: int, placed_amazons: list[(int, int)]) -> (bool, list, list[int], list[int]):
+    """
+    Check that the forced amazons of an instance do not make it trivially UNSAT
+    :param size: length/width of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :return: a tuple (feasible, conflicts, empty_rows, empty_columns) where conflicts is the list of the pairs
+    of forced amazons attacking each other, empty_rows and empty_columns the rows and columns
+    without forced amazon where no amazon can be placed, and feasible is True iff the three lists are empty
+    """
+    for row, col in placed_amazons:
+        if not (0 <= row < size and 0 <= col < size):
+            raise ValueError("Indices : row_ind =", row, "column_ind =", col, "are incorrect")
+    amazons = list(dict.fromkeys(placed_amazons))
+
+    conflicts = []
+    for i, amazon in enumerate(amazons):
+        for other in amazons[i + 1:]:
+            if is_attacking(amazon, other):
+                conflicts.append((amazon, other))
+
+    # The attacks are symmetric along the main diagonal: the columns are the rows of the transposed chessboard
+    empty_rows = _empty_lines(size, amazons)
+    empty_columns = _empty_lines(size, [(col, row) for row, col in amazons])
+
+    return not (conflicts or empty_rows or empty_columns), conflicts, empty_rows, empty_columns
+
+
+def print_infeasibility(conflicts: list, empty_rows: list[int], empty_columns: list[int]):
+    """
+    Print the reasons found by check_feasibility
+    """
+    for amazon1, amazon2 in conflicts:
+        print("Forced amazons at positions {} and {} attack each other".format(amazon1, amazon2))
+    for row in empty_rows:
+        print("Every cell of row {} is attacked by a forced amazon".format(row))
+    for col in empty_columns:
+        print("Every cell of column {} is attacked by a forced amazon".format(col))
+
+
+def _empty_lines(size: int, amazons: list[(int, int)]) -> list[int]:
+    """
+    Find the rows without amazon in which every cell is attacked by an amazon
+    """
+    forced_rows = {row for row, _ in amazons}
+    empty_rows = []
+    for row in range(size):
+        if row in forced_rows:
+            continue
+        attacked = set()
+        for amazon_row, amazon_col in amazons:
+            distance = abs(row - amazon_row)
+            attacked.update((amazon_col, amazon_col - distance, amazon_col + distance))
+            if distance in JUMP_DISTANCES:
+                attacked.update((amazon_col - JUMP_DISTANCES[distance], amazon_col + JUMP_DISTANCES[distance]))
+        if sum(1 for col in attacked if 0 <= col < size) == size:
+            empty_rows.append(row)
+    return empty_rows
@@ -0,0 +1,49 @@
+"""
+Attack geometry of the amazon, shared by the encoders, the verifier, the feasibility check and the local search.
+
+An amazon attacks the cells of its row, its column, its diagonal and its anti-diagonal, and the cells
+a 3x2 or 4x1 move away. The lines are numbered globally: the rows from 0 to size - 1, the columns
+from size to 2 * size - 1, the diagonals (row - col constant) from 2 * size to 4 * size - 2 and
+the anti-diagonals (row + col constant) from 4 * size - 1 to 6 * size - 3.
+
+This module does not import NumPy, so that the checks start quickly: the line formulas only use
+arithmetic operators, they also apply to NumPy arrays of rows and columns.
+"""
+
+# Déplacements 3x2 et 4x1 d'une amazone : d'abord vers les lignes suivantes, puis vers les lignes précédentes
+JUMP_MOVES = [(1, -4), (1, 4), (2, -3), (2, 3), (3, -2), (3, 2), (4, -1), (4, 1)]
+ALL_JUMP_MOVES = JUMP_MOVES + [(-dr, -dc) for dr, dc in JUMP_MOVES]
+# Column distance of the 3x2 and 4x1 moves for each row distance
+JUMP_DISTANCES = {dr: dc for dr, dc in JUMP_MOVES if dc > 0}
+
+
+def n_lines(size: int) -> int:
+    return 6 * size - 2
+
+
+def column_line(col, size: int):
+    return size + col
+
+
+def diagonal_line(row, col, size: int):
+    return 3 * size - 1 + row - col
+
+
+def anti_diagonal_line(row, col, size: int):
+    return 4 * size - 1 + row + col
+
+
+def line_ids(row, col, size: int) -> tuple:
+    """
+    :return: the row, column, diagonal and anti-diagonal of a cell
+    """
+    return row, column_line(col, size), diagonal_line(row, col, size), anti_diagonal_line(row, col, size)
+
+
+def is_attacking(amazon1: (int, int), amazon2: (int, int)) -> bool:
+    """
+    Check if two amazons at different positions attack each other
+    :return: True iff they are on the same row, column or diagonal, or a 3x2 or 4x1 move apart
+    """
+    dr, dc = abs(amazon1[0] - amazon2[0]), abs(amazon1[1] - amazon2[1])
+    return dr == 0 or dc == 0 or dr == dc or JUMP_DISTANCES.get(dr) == dc
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Min-conflicts local search for very large N-amazons boards.
+
+Each row holds exactly one amazon, and the number of amazons on each column, diagonal and
+anti-diagonal is kept in a counter array indexed as in geometry, updated in O(1) when an amazon moves. The 3x2 and 4x1
+attacks of a cell are found by looking up the column of the amazon in the 16 rows a jump away.
+The rows of the forced amazons are never moved.
+
+The search starts from a greedy placement, then repeatedly picks a row in conflict and moves its
+amazon to the column with the fewest conflicts, the column it just left being tabu. The rows whose
+amazon attacks the new cell become candidates too, so that both sides of a conflict can move.
+It restarts from a new greedy placement when no solution is found after a number of moves.
+Local search is incomplete: it cannot prove that an instance is UNSAT.
+
+Usage: local_search.py INSTANCE_FILE [SEED]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from geometry import ALL_JUMP_MOVES, anti_diagonal_line, column_line, diagonal_line, n_lines
+from solve import read_instance, verify_amazons
+
+
+class MinConflicts:
+
+    def __init__(self, size: int, placed_amazons: list[(int, int)], rng: np.random.Generator,
+                 tabu_tenure: int = 10):
+        """
+        :param size: length/width of the chessboard
+        :param placed_amazons: a list of the already placed amazons
+        :param rng: the random number generator
+        :param tabu_tenure: the number of moves during which an amazon cannot go back to a column it left
+        """
+        self.size = size
+        self.rng = rng
+        self.tabu_tenure = tabu_tenure
+        for row, col in placed_amazons:
+            if not (0 <= row < size and 0 <= col < size):
+                raise ValueError("Indices : row_ind =", row, "column_ind =", col, "are incorrect")
+        self.forced = np.zeros(size, dtype=bool)
+        self.forced_columns = dict(placed_amazons)
+        self.forced[list(self.forced_columns)] = True
+        self.columns = np.arange(size)
+        self.col = np.full(size, -1, dtype=np.int64)
+        self.in_candidates = np.zeros(size, dtype=bool)
+
+    def place(self, row: int, col: int, delta: int = 1):
+        """
+        Add (delta = 1) or remove (delta = -1) the amazon of a row in the counters
+        """
+        self.line_count[column_line(col, self.size)] += delta
+        self.line_count[diagonal_line(row, col, self.size)] += delta
+        self.line_count[anti_diagonal_line(row, col, self.size)] += delta
+
+    def costs(self, row: int) -> np.ndarray:
+        """
+        Compute the number of conflicts of the amazon of a row for every column,
+        the amazon must not be in the counters
+        """
+        size = self.size
+        costs = (self.line_count[column_line(0, size):column_line(size, size)]
+                 + self.line_count[diagonal_line(row, self.columns, size)]
+                 + self.line_count[anti_diagonal_line(row, self.columns, size)])
+        for dr, dc in ALL_JUMP_MOVES:
+            other = row + dr
+            if 0 <= other < size and self.col[other] >= 0:
+                col = self.col[other] - dc
+                if 0 <= col < size:
+                    costs[col] += 1
+        return costs
+
+    def conflicts(self, row: int) -> int:
+        """
+        Compute the number of conflicts of the amazon of a row
+        """
+        col = self.col[row]
+        self.place(row, col, -1)
+        conflicts = self.costs(row)[col]
+        self.place(row, col)
+        return conflicts
+
+    def attackers(self, row: int, col: int) -> list[int]:
+        """
+        Find the rows whose amazon attacks the cell (row, col), the amazon of the row excluded
+        """
+        rows, size = self.columns, self.size
+        attacked = ((self.col == col) | (diagonal_line(rows, self.col, size) == diagonal_line(row, col, size))
+                    | (anti_diagonal_line(rows, self.col, size) == anti_diagonal_line(row, col, size)))
+        attacked[row] = False
+        attackers = np.flatnonzero(attacked).tolist()
+        for dr, dc in ALL_JUMP_MOVES:
+            other = row + dr
+            if 0 <= other < self.size and self.col[other] == col + dc:
+                attackers.append(other)
+        return attackers
+
+    def place_forced(self):
+        """
+        Reset the chessboard to the forced amazons only
+        """
+        size = self.size
+        # Number of amazons on each line, numbered as in geometry (the rows are not counted)
+        self.line_count = np.zeros(n_lines(size), dtype=np.int64)
+        self.col[:] = -1
+        for row, col in self.forced_columns.items():
+            self.col[row] = col
+            self.place(row, col)
+
+    def forced_conflicts(self) -> bool:
+        """
+        Check if the forced amazons attack each other, with the counters of the search: O(k) time
+        for k forced amazons, where the pairwise test of feasibility.check_feasibility takes O(k^2)
+        """
+        self.place_forced()
+        return any(self.conflicts(row) > 0 for row in self.forced_columns)
+
+    def restart(self):
+        """
+        Greedy placement: the free rows are taken in random order and each amazon is placed
+        in a column with the fewest conflicts with the amazons already placed
+        """
+        self.place_forced()
+        self.tabu_col = np.full(self.size, -1, dtype=np.int64)
+        self.tabu_until = np.zeros(self.size, dtype=np.int64)
+        for row in self.rng.permutation(np.flatnonzero(~self.forced)):
+            col = self.choose(row, self.costs(row))
+            self.col[row] = col
+            self.place(row, col)
+        # The free rows in conflict
+        self.candidates = [row for row in np.flatnonzero(~self.forced).tolist() if self.conflicts(row) > 0]
+        self.in_candidates[:] = False
+        self.in_candidates[self.candidates] = True
+
+    def choose(self, row: int, costs: np.ndarray, step: int = -1) -> int:
+        """
+        Choose a column with the fewest conflicts at random, the tabu column of the row excluded
+        """
+        if self.tabu_until[row] > step >= 0:
+            costs[self.tabu_col[row]] = np.iinfo(np.int64).max
+        best = np.flatnonzero(costs == costs.min())
+        return int(best[self.rng.integers(len(best))])
+
+    def step(self, step: int):
+        """
+        Move the amazon of a row in conflict to a column with the fewest conflicts
+        """
+        i = int(self.rng.integers(len(self.candidates)))
+        row = self.candidates[i]
+        old_col = self.col[row]
+        self.place(row, old_col, -1)
+        costs = self.costs(row)
+        if costs[old_col] == 0:
+            # The conflicts of the row have been solved by other moves
+            self.place(row, old_col)
+            self.remove_candidate(i)
+            return
+        col = self.choose(row, costs, step)
+        self.col[row] = col
+        self.place(row, col)
+        if col != old_col:
+            self.tabu_col[row] = old_col
+            self.tabu_until[row] = step + self.tabu_tenure
+        if costs[col] == 0:
+            self.remove_candidate(i)
+        else:
+            # The amazons attacking the new cell are now in conflict too
+            for other in self.attackers(row, col):
+                if not self.in_candidates[other] and not self.forced[other]:
+                    self.in_candidates[other] = True
+                    self.candidates.append(other)
+
+    def remove_candidate(self, i: int):
+        self.in_candidates[self.candidates[i]] = False
+        self.candidates[i] = self.candidates[-1]
+        self.candidates.pop()
+
+    def search(self, max_steps: int) -> bool:
+        """
+        Run the search from the current placement
+        :return: True iff a placement without conflict has been found within max_steps moves
+        """
+        for step in range(max_steps):
+            if not self.candidates:
+                return True
+            self.step(step)
+        return not self.candidates
+
+
+def local_search(size: int, placed_amazons: list[(int, int)], seed: int = None, max_steps: int = None,
+                 max_restarts: int = 100, tabu_tenure: int = 10) -> (bool, np.ndarray):
+    """
+    Solve the N-amazons problem with min-conflicts local search
+    :param size: length/width of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :param seed: the seed of the random number generator
+    :param max_steps: the number of moves before a restart, 10 * size + 1000 by default
+    :param max_restarts: the number of restarts before giving up
+    :param tabu_tenure: the number of moves during which an amazon cannot go back to a column it left
+    :return: a tuple (found, columns) where columns[i] is the column of the amazon at row i,
+    columns is None if no solution has been found, found is None if the forced amazons attack each other
+    """
+    forced_rows = [row for row, _ in set(placed_amazons)]
+    if len(forced_rows) != len(set(forced_rows)):
+        # Two forced amazons on the same row attack each other, the counters only hold one amazon per row
+        return None, None
+    search = MinConflicts(size, placed_amazons, np.random.default_rng(seed), tabu_tenure)
+    if search.forced_conflicts():
+        return None, None
+    for _ in range(max_restarts + 1):
+        search.restart()
+        if search.search(max_steps or 10 * size + 1000):
+            return True, search.col.copy()
+    return False, None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage:", sys.argv[0], "INSTANCE_FILE [SEED]", file=sys.stderr)
+        exit(1)
+
+    size, fixed_amazons = read_instance(sys.argv[1])
+    start = time.perf_counter()
+    found, columns = local_search(size, fixed_amazons, int(sys.argv[2]) if len(sys.argv) == 3 else None)
+    if found is None:
+        print("The forced amazons attack each other")
+        print("The problem is UNSAT")
+        exit(0)
+    if not found:
+        print("No solution found by the local search")
+        exit(0)
+    print("Solution found in {:.3f}s".format(time.perf_counter() - start))
+    print("Column of the amazon of each row : ")
+    print(columns.tolist())
+
+    valid = verify_amazons(size, list(enumerate(columns.tolist())), fixed_amazons)
+    if not valid:
+        print("The solution is not valid")
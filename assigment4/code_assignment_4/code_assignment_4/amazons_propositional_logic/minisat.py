@@ -1,7 +1,9 @@
 """Helper module to call minisat."""
 
 import os
-import tempfile
+import subprocess
+
+import numpy as np
 
 """Run Minisat on the given set of clauses. Return None if the clauses are
 unsatisfiable, or a solution that satisfies all the clauses (a sequence of
@@ -14,6 +16,9 @@ clauses -- sequence of clauses. Each clause is a tuple of integers
  representing the literals: a positive integer for a variable, a
  negative integer for the negated variable.
 executable -- name of the MiniSat executable to run
+as_array -- return the solution as a NumPy array instead of a list
+cache -- an optional result_cache.ResultCache, the solution of a CNF already
+ in the cache is read from it instead of running MiniSat
 
 Example:
 Consider a vocabulary with 3 variables A, B, C and the clauses !A || B,
@@ -26,22 +31,107 @@ meaning the clauses are satisfiable and {A=True, B=True, C=False} is a
 model."""
 
 
-def minisat(n, clauses, executable="./minisatLinux"):
+def minisat(n, clauses, executable="./minisatLinux", as_array=False, cache=None):
+    if cache is not None:
+        key = cache.key(n, clauses)
+        cached = cache.get(key)
+        if cached is not None:
+            return read_solution(cached, as_array)
     clause_path = './tmp/clauses.tmp'
+    # Creating and writing the clause file
+    clause_file = open(clause_path, 'wt')
+    print('p cnf', n, len(clauses), file=clause_file)
+    for c in clauses:
+        print(c, '0', file=clause_file)
+    clause_file.close()
+    result = run_minisat(clause_path, executable, as_array)
+    if cache is not None:
+        cache.put(key, './tmp/sol.tmp')
+    return result
+
+
+def minisat_literals(n, n_clauses, literals, executable="./minisatLinux", as_array=False, cache=None):
+    """Same as minisat, but the clauses are given as a flat NumPy buffer in
+    which each clause is terminated by a 0 (see amazons_sat.get_literals).
+    The buffer is written to the clause file in a single call.
+    If as_array is True, the solution is returned as a NumPy array.
+    If cache is a result_cache.ResultCache, Minisat is only run if the CNF
+    is not already in the cache."""
+    if cache is not None:
+        key = cache.key_from_literals(n, literals)
+        cached = cache.get(key)
+        if cached is not None:
+            return read_solution(cached, as_array)
+    clause_path = './tmp/clauses.tmp'
+    with open(clause_path, 'wt') as clause_file:
+        print('p cnf', n, n_clauses, file=clause_file)
+        clause_file.flush()
+        literals.tofile(clause_file, sep=' ')
+    result = run_minisat(clause_path, executable, as_array)
+    if cache is not None:
+        cache.put(key, './tmp/sol.tmp')
+    return result
+
+
+def minisat_stream(n, n_clauses, chunks, executable="./minisatLinux", as_array=False):
+    """Same as minisat_literals, but the clauses are given as an iterable of
+    flat NumPy buffers (see amazons_sat.iter_literals) and are piped to the
+    standard input of Minisat as they are generated, without writing the
+    clause file. The number of clauses must be known upfront (see
+    amazons_sat.count_clauses) since it is part of the header."""
     sol_path = './tmp/sol.tmp'
     out_path = './tmp/minisat.out'
+    _remove_solution(sol_path)
+    with open(out_path, 'wb') as out_file:
+        process = subprocess.Popen([executable, '/dev/stdin', sol_path], stdin=subprocess.PIPE, stdout=out_file)
+        try:
+            process.stdin.write(('p cnf %d %d\n' % (n, n_clauses)).encode())
+            for chunk in chunks:
+                process.stdin.write(' '.join(map(str, chunk.tolist())).encode())
+                process.stdin.write(b'\n')
+            process.stdin.close()
+        finally:
+            process.wait()
+    _check_status(process.returncode, executable)
+    return read_solution(sol_path, as_array)
+
+
+def run_minisat(clause_path, executable="./minisatLinux", as_array=False):
+    """Run Minisat on an already written clause file and read its solution.
+    If as_array is True, the solution line is parsed directly into a NumPy
+    array of the true variables instead of a list.
+    Raise an OSError if Minisat did not give an answer."""
+    sol_path = './tmp/sol.tmp'
+    out_path = './tmp/minisat.out'
+    _remove_solution(sol_path)
+    status = os.system('%s %s %s > %s' % (executable, clause_path, sol_path, out_path))
+    _check_status(os.waitstatus_to_exitcode(status), executable)
+    return read_solution(sol_path, as_array)
+
+
+def _remove_solution(sol_path):
+    """Remove the solution file of the previous run, so that it cannot be
+    read as the solution of the next one."""
+    if os.path.exists(sol_path):
+        os.remove(sol_path)
+
+
+def _check_status(status, executable):
+    """Check the exit status of Minisat: 10 if SAT, 20 if UNSAT."""
+    if status not in (10, 20):
+        raise OSError("Minisat ({}) failed with exit status {}".format(executable, status))
+
+
+def read_solution(sol_path, as_array=False):
+    """Read the solution file written by Minisat."""
     try:
-        # Creating and writing the clause file
-        clause_file = open(clause_path, 'wt')
-        print('p cnf', n, len(clauses), file=clause_file)
-        for c in clauses:
-            print(c, '0', file=clause_file)
-        clause_file.close()
         # Reading the sol file
-        os.system('%s %s %s > %s' % (executable, clause_path, sol_path, out_path))
         out_file = open(sol_path)
         if out_file.readline().strip() == 'UNSAT':
             return False, None
+        elif as_array:
+            model = np.fromstring(out_file.readline(), dtype=np.int64, sep=' ')
+            return True, model[model > 0]
         else:
             return True, [int(x) for x in out_file.readline().strip().split(' ') if int(x) > 0]
     finally:
@@ -0,0 +1,67 @@
+"""
+Asyncio variant of minisat.minisat, for services solving many CNFs concurrently.
+
+MiniSat is launched with the asyncio subprocess primitives, so the event loop keeps running
+while it solves, and the clause and solution files are written and read in a worker thread.
+Each solve uses its own temporary directory, so that concurrent solves do not share files.
+The number of MiniSat processes running at the same time is bounded by a semaphore, and a solve
+that times out or is cancelled kills its MiniSat process.
+
+Example:
+
+solver = AsyncMinisat('./minisatLinux', max_concurrency=8)
+results = await asyncio.gather(*(solver.solve(n, clauses, timeout=10) for n, clauses in problems))
+"""
+
+import asyncio
+import os
+import tempfile
+
+from minisat import _check_status, read_solution
+
+
+def _write_clauses(clause_path, n, clauses):
+    with open(clause_path, 'wt') as clause_file:
+        print('p cnf', n, len(clauses), file=clause_file)
+        for c in clauses:
+            print(c, '0', file=clause_file)
+
+
+class AsyncMinisat:
+
+    def __init__(self, executable="./minisatLinux", max_concurrency=None):
+        """
+        :param executable: name of the MiniSat executable to run
+        :param max_concurrency: the maximum number of MiniSat processes running at the same time,
+        the number of CPUs by default
+        """
+        self.executable = os.path.abspath(executable)
+        self.semaphore = asyncio.Semaphore(max_concurrency or os.cpu_count())
+
+    async def solve(self, n, clauses, timeout=None, as_array=False):
+        """
+        Same as minisat.minisat, without blocking the event loop
+        :param n: number of variables
+        :param clauses: sequence of clauses, each clause being a string of literals separated by spaces
+        :param timeout: the maximum solving time in seconds, asyncio.TimeoutError is raised when it is exceeded
+        :param as_array: return the solution as a NumPy array instead of a list
+        :return: a tuple (SAT, solution) where solution is None if SAT is False
+        Raise an OSError if MiniSat did not give an answer, like minisat.minisat
+        """
+        async with self.semaphore:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                clause_path = os.path.join(tmp_dir, 'clauses.tmp')
+                sol_path = os.path.join(tmp_dir, 'sol.tmp')
+                await asyncio.to_thread(_write_clauses, clause_path, n, clauses)
+                process = await asyncio.create_subprocess_exec(self.executable, clause_path, sol_path,
+                                                               stdout=asyncio.subprocess.DEVNULL,
+                                                               stderr=asyncio.subprocess.DEVNULL)
+                try:
+                    await asyncio.wait_for(process.wait(), timeout)
+                finally:
+                    # Timeout or cancellation
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+                _check_status(process.returncode, self.executable)
+                return await asyncio.to_thread(read_solution, sol_path, as_array)
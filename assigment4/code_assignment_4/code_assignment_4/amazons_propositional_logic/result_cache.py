@@ -0,0 +1,110 @@
+"""
+On-disk cache of the results of MiniSat, addressed by the content of the CNF.
+
+The key of a CNF is the SHA-256 of its normalized form: the literals of each clause are sorted,
+duplicated literals and clauses are removed and the clauses are sorted, so that the same
+problem written in another order is found in the cache. The value is the solution file
+written by MiniSat (SAT and a model, or UNSAT), stored as <key>.sol in the cache directory.
+
+The size of the directory is bounded: when it exceeds max_bytes, the least recently used
+entries are removed. An entry is used when it is written or read.
+
+Example:
+
+cache = ResultCache('./cache')
+is_sat, solution = minisat.minisat(n, clauses, './minisatLinux', cache=cache)
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+class ResultCache:
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Open the cache stored in the given directory, creating it if needed
+        :param directory: the path to the cache directory
+        :param max_bytes: the maximum total size of the cached solution files
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, n: int, clauses) -> str:
+        """
+        Compute the key of a CNF
+        :param n: the number of variables
+        :param clauses: an iterable of clauses, each clause being a string of literals
+        separated by spaces or a sequence of integers
+        :return: the hexadecimal SHA-256 digest of the normalized CNF
+        """
+        normalized = sorted({tuple(sorted({int(x) for x in (c.split() if isinstance(c, str) else c)}))
+                             for c in clauses})
+        digest = hashlib.sha256(('p cnf %d\n' % n).encode())
+        for clause in normalized:
+            digest.update((' '.join(map(str, clause)) + ' 0\n').encode())
+        return digest.hexdigest()
+
+    def key_from_literals(self, n: int, literals: np.ndarray) -> str:
+        """
+        Same as key, for a flat buffer of 0-terminated clauses (see amazons_sat.get_literals)
+        """
+        ends = np.flatnonzero(literals == 0)
+        starts = np.concatenate([[0], ends[:-1] + 1])
+        return self.key(n, (literals[start:end].tolist() for start, end in zip(starts, ends)))
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.sol')
+
+    def get(self, key: str) -> str | None:
+        """
+        Look up a CNF in the cache
+        :param key: the key of the CNF
+        :return: the path to the cached solution file, or None if the CNF is not in the cache
+        """
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, sol_path: str):
+        """
+        Store the solution file written by MiniSat for a CNF, then evict the least recently used entries
+        :param key: the key of the CNF
+        :param sol_path: the path to the solution file
+        """
+        # Copy then rename, so that a concurrent reader never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        shutil.copyfile(sol_path, tmp_path)
+        os.replace(tmp_path, self.path(key))
+        self.evict(keep=key)
+
+    def evict(self, keep: str = None):
+        """
+        Remove the least recently used entries until the cache fits in max_bytes
+        :param keep: the key of an entry that must not be removed
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.sol'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == self.path(keep):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
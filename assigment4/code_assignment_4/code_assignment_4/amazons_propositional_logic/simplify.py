@@ -0,0 +1,120 @@
+"""
+Optional simplification of a CNF before it is given to MiniSat.
+
+The simplification removes duplicated and tautological clauses, applies unit propagation
+(the fixed literals are kept as unit clauses so that they still appear in the model found
+by MiniSat), removes the clauses made equal by propagation and removes the clauses subsumed
+by a smaller one. The resulting CNF is equisatisfiable and every model of it is a model
+of the original CNF.
+
+Example:
+
+>>> simplify([(1, 2), (2, 1), (-1,), (2, 3, -4), (-2, 3)])
+([[-1], [2], [3]], {'duplicates': 1, 'tautologies': 0, 'satisfied': 1, 'false_literals': 2, 'subsumed': 0, 'removed': 2})
+"""
+
+from collections import defaultdict
+
+
+def simplify(clauses, subsumption: bool = True) -> (list[list[int]], dict):
+    """
+    Simplify a CNF
+    :param clauses: an iterable of clauses, each clause being a sequence of MiniSAT literals
+    :param subsumption: True iff the clauses subsumed by another one must be removed,
+    this is the most expensive step of the simplification
+    :return: a tuple (clauses, stats) where clauses is the simplified list of clauses and stats counts
+    the removed clauses and literals for each step. If the CNF is found unsatisfiable,
+    clauses only contains the empty clause
+    """
+    stats = {'duplicates': 0, 'tautologies': 0, 'satisfied': 0, 'false_literals': 0, 'subsumed': 0}
+
+    # Duplicated and tautological clauses
+    n_clauses = 0
+    seen = set()
+    unique = []
+    for clause in clauses:
+        n_clauses += 1
+        key = frozenset(clause)
+        if any(-literal in key for literal in key):
+            stats['tautologies'] += 1
+        elif key in seen:
+            stats['duplicates'] += 1
+        else:
+            seen.add(key)
+            unique.append(set(key))
+    del seen
+
+    # Unit propagation
+    occurrences = defaultdict(list)
+    for index, clause in enumerate(unique):
+        for literal in clause:
+            occurrences[literal].append(index)
+    alive = [True] * len(unique)
+    # Each literal to fix comes with the index of the clause that fixed it
+    queue = [(next(iter(clause)), index) for index, clause in enumerate(unique) if len(clause) == 1]
+    fixed = set()
+    while queue:
+        literal, source = queue.pop()
+        if literal in fixed:
+            continue
+        if -literal in fixed:
+            return [[]], _with_total(stats, n_clauses, 1)
+        fixed.add(literal)
+        for index in occurrences[literal]:
+            if alive[index]:
+                alive[index] = False
+                # The clause that fixed the literal is given back as a unit clause
+                if index != source:
+                    stats['satisfied'] += 1
+        for index in occurrences[-literal]:
+            if alive[index]:
+                clause = unique[index]
+                clause.discard(-literal)
+                stats['false_literals'] += 1
+                if not clause:
+                    return [[]], _with_total(stats, n_clauses, 1)
+                if len(clause) == 1:
+                    queue.append((next(iter(clause)), index))
+
+    # Clauses made equal by the removal of their false literals
+    remaining = []
+    seen = set()
+    for index in range(len(unique)):
+        if alive[index]:
+            key = frozenset(unique[index])
+            if key in seen:
+                alive[index] = False
+                stats['duplicates'] += 1
+            else:
+                seen.add(key)
+                remaining.append(index)
+    del seen
+
+    # Subsumed clauses : a clause is subsumed by any smaller clause included in it
+    if subsumption:
+        occurrences = defaultdict(list)
+        for index in remaining:
+            for literal in unique[index]:
+                occurrences[literal].append(index)
+        for index in sorted(remaining, key=lambda i: len(unique[i])):
+            clause = unique[index]
+            if not alive[index]:
+                continue
+            rarest = min(clause, key=lambda literal: len(occurrences[literal]))
+            for other in occurrences[rarest]:
+                if alive[other] and len(unique[other]) > len(clause) and clause <= unique[other]:
+                    alive[other] = False
+                    stats['subsumed'] += 1
+        remaining = [index for index in remaining if alive[index]]
+
+    simplified = [[literal] for literal in sorted(fixed, key=abs)]
+    simplified += [sorted(unique[index], key=abs) for index in remaining]
+    return simplified, _with_total(stats, n_clauses, len(simplified))
+
+
+def _with_total(stats: dict, n_clauses: int, n_simplified: int) -> dict:
+    """
+    Add the total number of removed clauses to the statistics of simplify
+    """
+    stats['removed'] = n_clauses - n_simplified
+    return stats
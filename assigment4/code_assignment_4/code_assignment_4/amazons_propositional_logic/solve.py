@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Command line entry point of the SAT solver of the N-amazons problem.
+
+The MiniSat executable of the current platform is found next to this file. The heavy backends
+(NumPy, python-sat, pycsp3) are only imported by the code paths using them, so that the checks
+of an existing solution and the short jobs start quickly.
+
+Usage:
+solve.py INSTANCE_FILE [--simplify] [--cache DIR] [--processes N] [--cp] [--explain]
+solve.py INSTANCE_FILE --verify SOLUTION_FILE
+solve.py --import-time
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import TYPE_CHECKING
+
+from geometry import ALL_JUMP_MOVES, anti_diagonal_line, column_line, diagonal_line, n_lines
+
+if TYPE_CHECKING:
+    import numpy as np
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ['numpy', 'pysat.solvers', 'pycsp3', 'amazons_sat', 'minisat', 'amazons_cp']
+
+# Déplacements 3x2 et 4x1 d'une amazone, dans l'ordre des messages de verify_3_2_moves et verify_4_1_moves :
+# les lignes les plus éloignées d'abord, puis les lignes et les colonnes croissantes
+MOVES_3_2 = sorted((move for move in ALL_JUMP_MOVES if abs(move[0]) in (2, 3)), key=lambda move: (-abs(move[0]), move))
+MOVES_4_1 = sorted((move for move in ALL_JUMP_MOVES if abs(move[0]) in (1, 4)), key=lambda move: (-abs(move[0]), move))
+
+
+def minisat_executable() -> str:
+    """
+    :return: the path to the MiniSat executable of the current platform
+    """
+    return os.path.join(PACKAGE_DIR, 'minisatMac' if sys.platform == 'darwin' else 'minisatLinux')
+
+
+def verify_line(line: list[int]) -> bool:
+    """
+    Check that a line contains at most one amazon
+    :param line: the line to check
+    :return: True iff the line contains at most one amazon
+    """
+    has_amazon = False
+    for i in range(len(line)):
+        if has_amazon and line[i] == 1:
+            return False
+        if not has_amazon and line[i] == 1:
+            has_amazon = True
+    return True
+
+
+def verify_diagonals(grid : list[list[int]], index_ref: (int, int)) -> bool:
+    """
+    Check that an amazon has no conflict with another amazon on its diagonal
+    :param grid: the solution
+    :param index_ref: the position of the amazon
+    :return: True iff there is no other amazon on the diagonal
+    """
+    for i in range(1, len(grid)):
+        if index_ref[0] - i >= 0 and index_ref[1] - i >= 0:
+            if grid[index_ref[0] - i][index_ref[1] - i] == 1:
+                return False
+
+        if index_ref[0] + i < len(grid) and index_ref[1] - i >= 0:
+            if grid[index_ref[0] + i][index_ref[1] - i] == 1:
+                return False
+
+        if index_ref[0] - i >= 0 and index_ref[1] + i < len(grid):
+            if grid[index_ref[0] - i][index_ref[1] + i] == 1:
+                return False
+
+        if index_ref[0] + i < len(grid) and index_ref[1] + i < len(grid):
+            if grid[index_ref[0] + i][index_ref[1] + i] == 1:
+                return False
+    return True
+
+
+def verify_3_2_moves(grid : list[list[int]], index_ref: (int, int)) -> bool:
+    """
+    Check that an amazon has no conflict with another amazon on its 3x2 moves
+    :param grid: the solution
+    :param index_ref: the position of the amazon
+    :return: True iff there is no other amazon on the diagonal
+    """
+    valid = True
+    tests = [(index_ref[0] + dr, index_ref[1] + dc) for dr, dc in MOVES_3_2]
+
+    for test in tests:
+        if 0 <= test[0] < len(grid) and 0 <= test[1] < len(grid):
+            if grid[test[0]][test[1]] == 1:
+                print("3x2 conflict between ({}, {}) and ({}, {})".format(index_ref[0], index_ref[1], test[0], test[1]))
+                valid = False
+
+    return valid
+
+
+def verify_4_1_moves(grid: list[list[int]], index_ref: (int, int)) -> bool:
+    """
+    Check that an amazon has no conflict with another amazon on its 4x1 moves
+    :param grid: the solution
+    :param index_ref: the position of the amazon
+    :return: True iff there is no other amazon on the diagonal
+    """
+    valid = True
+    tests = [(index_ref[0] + dr, index_ref[1] + dc) for dr, dc in MOVES_4_1]
+
+    for test in tests:
+        if 0 <= test[0] < len(grid) and 0 <= test[1] < len(grid):
+            if grid[test[0]][test[1]] == 1:
+                print("4x1 conflict between ({}, {}) and ({}, {})".format(index_ref[0], index_ref[1], test[0], test[1]))
+                valid = False
+    return valid
+
+
+def verify_n_amazons(grid : list[list[int]], placed_amazons):
+    """
+    Check the validity of the solution
+    :param grid: the solution to check
+    :param placed_amazons: the set of placed amazons defined by the instance
+    :return: True iff the solution is valid
+    """
+    amazons = [(i, j) for i, row in enumerate(grid) for j, value in enumerate(row) if value == 1]
+    return verify_amazons(len(grid), amazons, placed_amazons)
+
+
+def verify_amazons(size: int, amazons: list[(int, int)], placed_amazons) -> bool:
+    """
+    Check the validity of a solution given by the positions of its amazons, in O(size) memory
+    The amazons of each row, column and diagonal are counted, and the cells a 3x2 or 4x1 move away
+    from each amazon are looked up in the set of the positions
+    :param size: length/width of the chessboard
+    :param amazons: the positions of the amazons of the solution
+    :param placed_amazons: the set of placed amazons defined by the instance
+    :return: True iff the solution is valid
+    """
+    valid = True
+    positions = set(amazons)
+
+    for amazon in placed_amazons:
+        if (amazon[0], amazon[1]) not in positions:
+            valid = False
+            print("Forced amazon at position ({}, {}) is missing".format(amazon[0], amazon[1]))
+
+    # Number of amazons on each line, numbered as in geometry
+    counts = [0] * n_lines(size)
+    for i, j in amazons:
+        counts[i] += 1
+        counts[column_line(j, size)] += 1
+        counts[diagonal_line(i, j, size)] += 1
+        counts[anti_diagonal_line(i, j, size)] += 1
+
+    for i in range(size):
+        if counts[i] > 1:
+            valid = False
+            print("Line {} contains several amazons".format(i))
+        if counts[column_line(i, size)] > 1:
+            valid = False
+            print("Column {} contains several amazons".format(i))
+
+    for i, j in amazons:
+        if counts[diagonal_line(i, j, size)] > 1 or counts[anti_diagonal_line(i, j, size)] > 1:
+            valid = False
+            print("Diagonals of amazon at position ({}, {}) contains other amazons".format(i, j))
+        for name, moves in (("3x2", MOVES_3_2), ("4x1", MOVES_4_1)):
+            for dr, dc in moves:
+                if (i + dr, j + dc) in positions:
+                    print("{} conflict between ({}, {}) and ({}, {})".format(name, i, j, i + dr, j + dc))
+                    valid = False
+
+    if len(amazons) < size:
+        valid = False
+        print("Some amazons are missing")
+
+    if len(amazons) > size:
+        valid = False
+        print("There are too many amazons")
+
+    return valid
+
+
+def read_instance(filename: str) -> (int, list[(int, int)]):
+    """
+    Read the given instance file
+    :param filename: the path to the instance file
+    :return: a tuple containing the length/width of the chessboard and a list
+    of (i, j) tuples containing the position of the forced amazons where i is the row index and j is the column index
+    """
+    with open(filename, 'r') as file:
+        lines = file.readlines()
+    size, placed_amazon_nbr = [int(x) for x in lines[0].strip().split(" ")]
+    placed_amazons = []
+    for i in range(1, placed_amazon_nbr + 1):
+        column, row = [int(x) for x in lines[i].strip().split(" ")]
+        placed_amazons.append((column, row))
+    return size, placed_amazons
+
+
+def read_grid(filename: str) -> list[list[int]]:
+    """
+    Read a solution, one row per line, as printed by this script ([0, 1, 0]) or as plain digits (0 1 0)
+    :param filename: the path to the solution file
+    :return: the grid, grid[i][j] == 1 iff there is an amazon at row i and column j
+    """
+    with open(filename, 'r') as file:
+        return [[int(c) for c in line if c in '01'] for line in file if any(c in '01' for c in line)]
+
+
+def get_val_from_index(index: int, size: int) -> (int, int):
+    """
+    Utility function to retrieve the positions of the amazons from the set of literal returned as a solution by MiniSAT
+    :param index: the index of the literal in the MiniSAT solution
+    :param size: the length/width of the chessboard
+    :return: a tuple (i, j) representing the position of the amazon where i is the row index and j is the column index
+    """
+    index -= 1
+    row_ind, column_ind = divmod(index, size)
+    return row_ind, column_ind
+
+
+def get_grid_from_solution(solution: 'np.ndarray', size: int) -> 'np.ndarray':
+    """
+    Vectorized version of get_val_from_index, building the whole chessboard at once
+    :param solution: the array of the true literals in the MiniSAT solution
+    :param size: the length/width of the chessboard
+    :return: a 2D array where grid[i][j] == 1 iff there is an amazon at row i and column j
+    """
+    import numpy as np
+    row_ind, column_ind = np.divmod(solution - 1, size)
+    grid = np.zeros((size, size), dtype=np.int8)
+    grid[row_ind, column_ind] = 1
+    return grid
+
+
+def solve_sat(size: int, placed_amazons: list[(int, int)], executable: str = None, simplify_cnf: bool = False,
+              cache_dir: str = None, processes: int = None) -> (bool, list[list[int]]):
+    """
+    Solve an instance with MiniSat, in the current directory (the CNF files are written to ./tmp)
+    :param size: length/width of the chessboard
+    :param placed_amazons: a list of the already placed amazons
+    :param executable: the MiniSat executable, the one of the current platform by default
+    :param simplify_cnf: simplify the CNF before calling MiniSat
+    :param cache_dir: the directory of a result cache, no cache by default
+    :param processes: solve with cube-and-conquer on this number of processes instead of a single MiniSat
+    :return: a tuple (SAT, grid) where grid is None if SAT is False
+    """
+    if processes is not None:
+        from cube_and_conquer import cube_and_conquer
+        is_sat, grid = cube_and_conquer(size, placed_amazons, processes)
+        return is_sat, grid.tolist() if is_sat else None
+
+    import minisat
+    from amazons_sat import count_clauses, get_literals, iter_clauses, iter_literals
+    executable = executable or minisat_executable()
+    os.makedirs('tmp', exist_ok=True)
+    nb_vars = size * size
+    cache = None
+    if cache_dir is not None:
+        from result_cache import ResultCache
+        cache = ResultCache(cache_dir)
+
+    if simplify_cnf:
+        from simplify import simplify
+        clauses, stats = simplify(clause for chunk in iter_literals(size, placed_amazons)
+                                  for clause in iter_clauses(chunk))
+        print("Simplification removed {} clauses ({} duplicated, {} satisfied, {} subsumed)".format(
+            stats['removed'], stats['duplicates'], stats['satisfied'], stats['subsumed']))
+        is_sat, solution = minisat.minisat(nb_vars, [' '.join(map(str, clause)) for clause in clauses], executable,
+                                           as_array=True, cache=cache)
+    elif cache is not None:
+        literals, n_clauses = get_literals(size, placed_amazons)
+        is_sat, solution = minisat.minisat_literals(nb_vars, n_clauses, literals, executable, as_array=True,
+                                                    cache=cache)
+    else:
+        n_clauses = count_clauses(size, len(placed_amazons))
+        is_sat, solution = minisat.minisat_stream(nb_vars, n_clauses, iter_literals(size, placed_amazons), executable,
+                                                  as_array=True)
+    if not is_sat:
+        return False, None
+    return True, get_grid_from_solution(solution, size).tolist()
+
+
+def print_explanation(size: int, placed_amazons: list[(int, int)]):
+    """
+    Print a minimal set of forced amazons making an UNSAT instance UNSAT
+    """
+    from amazons_session import AmazonsSession
+    with AmazonsSession(size) as session:
+        for row, column in placed_amazons:
+            session.place(row, column)
+        conflict = session.explain()
+    if conflict is None:
+        print("The forced amazons are compatible")
+    elif not conflict:
+        print("There is no solution even without forced amazons")
+    else:
+        print("Minimal conflict between the forced amazons at positions",
+              ", ".join("({}, {})".format(row, column) for row, column in conflict))
+
+
+def import_times(modules: list[str] = HEAVY_MODULES) -> dict:
+    """
+    Measure the import time of each module in a fresh interpreter, as seen by this package
+    :return: a dictionary module -> time in seconds, None if the module cannot be imported
+    """
+    import subprocess
+    code = ("import sys, time; sys.path[:0] = [{!r}, {!r}]; sys.argv = sys.argv[:1]; start = time.perf_counter(); "
+            "import {{}}; print(time.perf_counter() - start)").format(PACKAGE_DIR, os.path.dirname(PACKAGE_DIR))
+    times = {}
+    for module in ['sys'] + modules:
+        process = subprocess.run([sys.executable, '-c', code.format(module)], capture_output=True, text=True)
+        lines = process.stdout.split()
+        times[module] = float(lines[0]) if process.returncode == 0 and lines else None
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--help'], capture_output=True)
+    times['solve.py --help (startup)'] = time.perf_counter() - start
+    return times
+
+
+def main(argv: list[str] = None, executable: str = None):
+    parser = argparse.ArgumentParser(description="Solve (or verify a solution of) an N-amazons instance")
+    parser.add_argument('instance', nargs='?', help="the instance file")
+    parser.add_argument('--verify', metavar='SOLUTION_FILE', help="only check a solution of the instance")
+    parser.add_argument('--simplify', action='store_true', help="simplify the CNF before calling MiniSat")
+    parser.add_argument('--cache', metavar='DIR', help="reuse the MiniSat results cached in this directory")
+    parser.add_argument('--processes', type=int, help="solve with cube-and-conquer on this number of processes")
+    parser.add_argument('--cp', action='store_true', help="solve with the CP model (pycsp3/Choco) instead of MiniSat")
+    parser.add_argument('--explain', action='store_true',
+                        help="if the problem is UNSAT, print a minimal set of conflicting forced amazons")
+    parser.add_argument('--import-time', action='store_true', help="measure the import time of the heavy modules")
+    args = parser.parse_args(argv)
+
+    if args.import_time:
+        for module, seconds in import_times().items():
+            print("{:<30} {}".format(module, "unavailable" if seconds is None else "{:.3f}s".format(seconds)))
+        return
+    if args.instance is None:
+        parser.error("the instance file is required")
+
+    size, fixed_amazons = read_instance(args.instance)
+    if args.verify is not None:
+        valid = verify_n_amazons(read_grid(args.verify), fixed_amazons)
+        print("The solution is valid" if valid else "The solution is not valid")
+        exit(0 if valid else 1)
+
+    from feasibility import check_feasibility, print_infeasibility
+    feasible, conflicts, empty_rows, empty_columns = check_feasibility(size, fixed_amazons)
+    if not feasible:
+        print_infeasibility(conflicts, empty_rows, empty_columns)
+        print("The problem is UNSAT")
+        if args.explain:
+            print_explanation(size, fixed_amazons)
+        return
+
+    if args.cp:
+        sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+        # pycsp3 parses the command line when it is imported, it must not see the options of this script
+        sys.argv = sys.argv[:1]
+        from amazons_cp import amazons_cp
+        is_sat, grid = amazons_cp(size, fixed_amazons)
+    else:
+        is_sat, grid = solve_sat(size, fixed_amazons, executable, args.simplify, args.cache, args.processes)
+
+    if not is_sat:
+        print("The problem is UNSAT")
+        if args.explain:
+            print_explanation(size, fixed_amazons)
+        return
+    print("The problem is SAT")
+    print("Solution : ")
+    for row in grid:
+        print(row)
+
+    valid = verify_n_amazons(grid, fixed_amazons)
+    if not valid:
+        print("The solution is not valid")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import numpy as np
+
 from clause import *
 
 """
@@ -23,18 +25,23 @@ number of nodes and available colors
 """
 
 
+# Static definition of the problem
+NODES = {0, 1, 2, 3, 4}
+N_COLORS = 3
+EDGES = [
+    (0, 1),
+    (1, 2),
+    (2, 3),
+    (3, 4),
+    (2, 4)
+]
+
+
 def get_expression():
 
-    # Static definition of the problem
-    nodes = {0, 1, 2, 3, 4}
-    n_colors = 3
-    edges = [
-        (0, 1),
-        (1, 2),
-        (2, 3),
-        (3, 4),
-        (2, 4)
-    ]
+    nodes = NODES
+    n_colors = N_COLORS
+    edges = EDGES
 
     expression = []
 
@@ -66,3 +73,45 @@ def get_expression():
             expression.append(clause)
 
     return expression
+
+
+def get_literals(n_nodes: int, n_colors: int, edges: list[(int, int)]) -> (np.ndarray, int):
+    """
+    Vectorized version of get_expression for large graphs.
+    The clauses are the same, in the same order, but instead of one Clause object per clause
+    they are written in a single flat buffer in the MiniSAT format: the literals of each
+    clause followed by a 0.
+    :param n_nodes: the number of nodes, numbered from 0 to n_nodes - 1
+    :param n_colors: the number of available colors
+    :param edges: a list of (node_a, node_b) tuples, or an array of shape (n_edges, 2)
+    :return: a tuple (literals, n_clauses) where literals is the flat buffer
+    and n_clauses is the number of clauses it contains
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    if edges.size and (edges.min() < 0 or edges.max() >= n_nodes):
+        raise ValueError("Edges refer to nodes outside of 0 ..", n_nodes - 1)
+
+    # var[node][color] is the 1D index of x_node_color in the MiniSAT format
+    var = np.arange(1, n_nodes * n_colors + 1, dtype=np.int64).reshape(n_nodes, n_colors)
+    color_a, color_b = np.triu_indices(n_colors, 1)
+
+    sizes = [n_nodes * (n_colors + 1), n_nodes * len(color_a) * 3, len(edges) * n_colors * 3]
+    literals = np.zeros(sum(sizes), dtype=np.int64)
+    ends = np.cumsum(sizes)
+
+    # Clauses # 1 : (x_node_color0 OR x_node_color1 OR .. OR x_node_ncolor)
+    at_least_one = literals[:ends[0]].reshape(n_nodes, n_colors + 1)
+    at_least_one[:, :-1] = var
+
+    # Clauses # 2 : (~x_node_color_a OR ~x_node_color_b)
+    at_most_one = literals[ends[0]:ends[1]].reshape(n_nodes, len(color_a), 3)
+    at_most_one[:, :, 0] = -var[:, color_a]
+    at_most_one[:, :, 1] = -var[:, color_b]
+
+    # Clauses # 3 : (~x_edge[0]_color OR ~x_edge[1]_color)
+    conflicts = literals[ends[1]:].reshape(len(edges), n_colors, 3)
+    conflicts[:, :, 0] = -var[edges[:, 0]]
+    conflicts[:, :, 1] = -var[edges[:, 1]]
+
+    n_clauses = n_nodes + n_nodes * len(color_a) + len(edges) * n_colors
+    return literals, n_clauses
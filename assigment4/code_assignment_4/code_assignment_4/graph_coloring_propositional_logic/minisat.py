@@ -1,7 +1,8 @@
 """Helper module to call minisat."""
 
 import os
-import tempfile
+
+import numpy as np
 
 """Run Minisat on the given set of clauses. Return None if the clauses are
 unsatisfiable, or a solution that satisfies all the clauses (a sequence of
@@ -28,20 +29,43 @@ model."""
 
 def minisat(n, clauses, executable="./minisatLinux"):
     clause_path = './tmp/clauses.tmp'
+    # Creating and writing the clause file
+    clause_file = open(clause_path, 'wt')
+    print('p cnf', n, len(clauses), file=clause_file)
+    for c in clauses:
+        print(c, '0', file=clause_file)
+    clause_file.close()
+    return run_minisat(clause_path, executable)
+
+
+def minisat_literals(n, n_clauses, literals, executable="./minisatLinux", as_array=False):
+    """Same as minisat, but the clauses are given as a flat NumPy buffer in
+    which each clause is terminated by a 0 (see graph_coloring.get_literals).
+    The buffer is written to the clause file in a single call.
+    If as_array is True, the solution is returned as a NumPy array."""
+    clause_path = './tmp/clauses.tmp'
+    with open(clause_path, 'wt') as clause_file:
+        print('p cnf', n, n_clauses, file=clause_file)
+        clause_file.flush()
+        literals.tofile(clause_file, sep=' ')
+    return run_minisat(clause_path, executable, as_array)
+
+
+def run_minisat(clause_path, executable="./minisatLinux", as_array=False):
+    """Run Minisat on an already written clause file and read its solution.
+    If as_array is True, the solution line is parsed directly into a NumPy
+    array of the true variables instead of a list."""
     sol_path = './tmp/sol.tmp'
     out_path = './tmp/minisat.out'
     try:
-        # Creating and writing the clause file
-        clause_file = open(clause_path, 'wt')
-        print('p cnf', n, len(clauses), file=clause_file)
-        for c in clauses:
-            print(c, '0', file=clause_file)
-        clause_file.close()
         # Reading the sol file
         os.system('%s %s %s > %s' % (executable, clause_path, sol_path, out_path))
         out_file = open(sol_path)
         if out_file.readline().strip() == 'UNSAT':
             return None
+        elif as_array:
+            model = np.fromstring(out_file.readline(), dtype=np.int64, sep=' ')
+            return model[model > 0]
         else:
             return [int(x) for x in out_file.readline().strip().split(' ') if int(x) > 0]
     finally:
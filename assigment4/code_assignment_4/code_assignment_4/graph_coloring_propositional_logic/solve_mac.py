@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
-from graph_coloring import get_expression
+import numpy as np
+from graph_coloring import NODES, N_COLORS, EDGES, get_literals
 import minisat
 
 
@@ -15,23 +16,34 @@ def get_val_from_index(index: int, n_color: int) -> (int, int):
     return node_ind, color_ind
 
 
+def get_colors_from_solution(solution: np.ndarray, n_nodes: int, n_color: int) -> np.ndarray:
+    """
+    Vectorized version of get_val_from_index, building the color of all the nodes at once
+    :param solution: the array of the true literals in the MiniSAT solution
+    :param n_nodes: the number of nodes
+    :param n_color: the number of available colors
+    :return: an array containing the color of each node, -1 if the node has no color
+    """
+    node_ind, color_ind = np.divmod(solution - 1, n_color)
+    output = np.full(n_nodes, -1, dtype=np.int64)
+    output[node_ind] = color_ind
+    return output
+
+
 if __name__ == "__main__":
 
-    expression = get_expression()
-    nb_vars = 5 * 3 # number of nodes x number of available colors
-    solution = minisat.minisat(nb_vars, [clause.minisat_str() for clause in expression], './minisatMac')
+    literals, n_clauses = get_literals(len(NODES), N_COLORS, EDGES)
+    nb_vars = len(NODES) * N_COLORS # number of nodes x number of available colors
+    solution = minisat.minisat_literals(nb_vars, n_clauses, literals, './minisatMac', as_array=True)
 
     if solution is None:
         print("The problem is UNSAT")
         exit(0)
     print("The problem is SAT")
     print("Solution : ")
-    output = [-1 for i in range(5)]
-    for s in solution:
-        node, color = get_val_from_index(s, 3)
-        output[node] = color
+    output = get_colors_from_solution(solution, len(NODES), N_COLORS)
 
-    print(output)
+    print(output.tolist())
 
         
 
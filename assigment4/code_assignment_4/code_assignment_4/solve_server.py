@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Long-running local solve server for N-amazons, graph coloring and Sudoku jobs.
+
+Clients connect to a Unix socket (or to a localhost TCP port) and send jobs as JSON objects,
+one per line. Each job is queued and run on a warm worker pool, and its result is streamed
+back as a JSON line as soon as it is ready, so the results may come back in any order:
+they carry the id of their job.
+
+Jobs:
+{"id": 1, "type": "amazons", "size": 25, "placed_amazons": [[0, 0], [1, 5]]}
+{"id": 2, "type": "graph_coloring", "n_nodes": 5, "n_colors": 3, "edges": [[0, 1], [1, 2]]}
+{"id": 3, "type": "sudoku", "puzzles": ["8..........36......7..9.2...5...7..."]}
+
+Results:
+{"id": 1, "status": "SAT", "solution": [[1, 0, ...], ...]}
+{"id": 2, "status": "UNSAT", "solution": null}
+{"id": 3, "results": [{"status": "SAT", "solution": [[8, 1, ...], ...]}]}
+{"id": 4, "error": "..."}
+
+The amazons and graph coloring packages both define modules named clause and minisat, so each
+job type has its own pool of worker processes, whose sys.path only contains its package.
+The workers are started (spawned, so that they do not inherit the client sockets) before the
+server accepts connections. Each worker imports its encoders and solver backends once, and works
+in a private directory so that the temporary files of MiniSat are never shared.
+
+Usage: solve_server.py (--unix PATH | --port PORT | --example) [--workers N] [--minisat EXECUTABLE]
+
+--example runs the example jobs through a server started in the same process on an ephemeral port,
+which tests the whole protocol offline.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIRS = {
+    'amazons': os.path.join(BASE_DIR, 'amazons_propositional_logic'),
+    'graph_coloring': os.path.join(BASE_DIR, 'graph_coloring_propositional_logic'),
+    'sudoku': BASE_DIR,
+}
+# The modules imported by the workers of each job type before their first job
+WARM_MODULES = {
+    'amazons': ('amazons_sat', 'feasibility', 'minisat', 'solve'),
+    'graph_coloring': ('graph_coloring', 'minisat', 'solve_linux'),
+    'sudoku': ('sudoku',),
+}
+
+_executable = None
+
+# The jobs of the documentation, plus a line that is valid JSON but not a job
+EXAMPLE_JOBS = [
+    {"id": 1, "type": "amazons", "size": 25, "placed_amazons": [[0, 0], [1, 5]]},
+    {"id": 2, "type": "graph_coloring", "n_nodes": 5, "n_colors": 3, "edges": [[0, 1], [1, 2]]},
+    {"id": 3, "type": "sudoku",
+     "puzzles": [".2.5.1.9.8..2.3..6.3..6..7...1...6..54.....19..2...7...9..3..8.2..8.4..7.1.9.7.6."]},
+    [1],
+]
+
+
+def _init_worker(job_type: str, executable: str):
+    """
+    Prepare a worker process for one job type: import path, private working directory and warm imports
+    """
+    global _executable
+    package_dir = PACKAGE_DIRS[job_type]
+    sys.path.insert(0, package_dir)
+    # pycsp3 parses the command line when it is imported, it must not see the options of the server
+    sys.argv = sys.argv[:1]
+    _executable = executable or os.path.join(package_dir, 'minisatMac' if sys.platform == 'darwin' else 'minisatLinux')
+    os.chdir(tempfile.mkdtemp(prefix='solve_server_'))
+    os.makedirs('tmp')
+    for module in WARM_MODULES[job_type]:
+        importlib.import_module(module)
+
+
+def _solve_amazons(job: dict) -> dict:
+    import minisat
+    from amazons_sat import count_clauses, iter_literals
+    from feasibility import check_feasibility
+    from solve import get_grid_from_solution
+
+    size = job['size']
+    placed_amazons = [tuple(amazon) for amazon in job.get('placed_amazons', [])]
+    if not check_feasibility(size, placed_amazons)[0]:
+        return {'status': 'UNSAT', 'solution': None}
+    is_sat, solution = minisat.minisat_stream(size * size, count_clauses(size, len(placed_amazons)),
+                                              iter_literals(size, placed_amazons), _executable, as_array=True)
+    if not is_sat:
+        return {'status': 'UNSAT', 'solution': None}
+    return {'status': 'SAT', 'solution': get_grid_from_solution(solution, size).tolist()}
+
+
+def _solve_graph_coloring(job: dict) -> dict:
+    import minisat
+    from graph_coloring import get_literals
+    from solve_linux import get_colors_from_solution
+
+    n_nodes, n_colors = job['n_nodes'], job['n_colors']
+    literals, n_clauses = get_literals(n_nodes, n_colors, job['edges'])
+    solution = minisat.minisat_literals(n_nodes * n_colors, n_clauses, literals, _executable, as_array=True)
+    if solution is None:
+        return {'status': 'UNSAT', 'solution': None}
+    return {'status': 'SAT', 'solution': get_colors_from_solution(solution, n_nodes, n_colors).tolist()}
+
+
+def _solve_sudoku(job: dict) -> dict:
+    from sudoku import parse_puzzle, solve_puzzles
+
+    puzzles = [parse_puzzle(p) if isinstance(p, str) else p for p in job['puzzles']]
+    return {'results': [{'status': 'SAT' if status else 'UNSAT', 'solution': solution}
+                        for status, solution in solve_puzzles(puzzles)]}
+
+
+SOLVERS = {
+    'amazons': _solve_amazons,
+    'graph_coloring': _solve_graph_coloring,
+    'sudoku': _solve_sudoku,
+}
+
+
+class SolveServer:
+
+    def __init__(self, workers: int = None, executable: str = None, max_pending: int = 1024):
+        """
+        :param workers: the number of worker processes of each job type, the number of CPUs by default
+        :param executable: the MiniSat executable, the one of each package for the current platform by default
+        :param max_pending: the maximum number of queued jobs, a client sending more jobs waits for results
+        """
+        self.workers = workers or os.cpu_count()
+        context = multiprocessing.get_context('spawn')
+        self.pools = {job_type: ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                                    initargs=(job_type, executable))
+                      for job_type in SOLVERS}
+        self.pending = asyncio.Semaphore(max_pending)
+
+    async def start_workers(self):
+        """
+        Start all the worker processes, a pool starts a new worker only when all the others are busy
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(pool, os.getpid)
+                               for pool in self.pools.values() for _ in range(self.workers)))
+
+    async def run_job(self, job: dict) -> dict:
+        """
+        Run a job on the worker pool of its type
+        :return: the result, with the id of the job
+        """
+        try:
+            job_type = job.get('type')
+            if job_type not in SOLVERS:
+                raise ValueError("Unknown job type: {}".format(job_type))
+            result = await asyncio.get_running_loop().run_in_executor(self.pools[job_type], SOLVERS[job_type], job)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            # A worker may also fail with SystemExit (pycsp3 exits on some errors), it must not stop the server
+            result = {'error': '{}: {}'.format(type(e).__name__, e)}
+        return {'id': job.get('id'), **result}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Read the jobs of a client and stream back the results as they are ready
+        """
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(job):
+            try:
+                result = await self.run_job(job)
+                async with lock:
+                    writer.write((json.dumps(result) + '\n').encode())
+                    await writer.drain()
+            finally:
+                self.pending.release()
+
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                await self.pending.acquire()
+                # The permit is released by answer once the job is started, here otherwise
+                started = False
+                try:
+                    # ValueError covers both the invalid JSON and the bytes that are not UTF-8
+                    job = json.loads(line)
+                    if not isinstance(job, dict):
+                        error = 'Invalid job: expected a JSON object, got {}'.format(type(job).__name__)
+                        writer.write((json.dumps({'id': None, 'error': error}) + '\n').encode())
+                        continue
+                    task = asyncio.create_task(answer(job))
+                    started = True
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                except ValueError as e:
+                    writer.write((json.dumps({'id': None, 'error': 'Invalid JSON: {}'.format(e)}) + '\n').encode())
+                finally:
+                    if not started:
+                        self.pending.release()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.shutdown(cancel_futures=True)
+
+
+async def serve(unix_path: str = None, port: int = None, workers: int = None, executable: str = None):
+    """
+    Run the server until it is cancelled
+    """
+    solve_server = SolveServer(workers, executable)
+    await solve_server.start_workers()
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(solve_server.handle_client, path=unix_path)
+    else:
+        server = await asyncio.start_server(solve_server.handle_client, host='127.0.0.1', port=port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        solve_server.close()
+
+
+async def submit(jobs: list[dict], unix_path: str = None, port: int = None):
+    """
+    Client side: send jobs to a running server
+    :return: an asynchronous generator of the results, in the order they are ready
+    """
+    if unix_path is not None:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for job in jobs:
+        writer.write((json.dumps(job) + '\n').encode())
+    await writer.drain()
+    writer.write_eof()
+    while line := await reader.readline():
+        yield json.loads(line)
+    writer.close()
+
+
+async def round_trip(jobs: list, workers: int = None, executable: str = None) -> list[dict]:
+    """
+    Offline round trip: start a server on an ephemeral localhost port in this process,
+    send it the jobs through submit and stop it once all the results are back
+    :return: the results, in the order they are ready
+    """
+    solve_server = SolveServer(workers, executable)
+    try:
+        await solve_server.start_workers()
+        server = await asyncio.start_server(solve_server.handle_client, host='127.0.0.1', port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return [result async for result in submit(jobs, port=port)]
+    finally:
+        solve_server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local solve server for N-amazons, graph coloring and Sudoku jobs")
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument('--unix', help="path of the Unix socket to listen on")
+    address.add_argument('--port', type=int, help="localhost TCP port to listen on")
+    address.add_argument('--example', action='store_true',
+                         help="solve the example jobs through an in-process server and print the results")
+    parser.add_argument('--workers', type=int, help="number of worker processes per job type")
+    parser.add_argument('--minisat', help="path to the MiniSat executable")
+    args = parser.parse_args()
+    if args.example:
+        for result in asyncio.run(round_trip(EXAMPLE_JOBS, args.workers, args.minisat)):
+            print(json.dumps(result))
+        exit(0)
+    try:
+        asyncio.run(serve(args.unix, args.port, args.workers, args.minisat))
+    except KeyboardInterrupt:
+        pass
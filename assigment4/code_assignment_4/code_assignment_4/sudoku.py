@@ -1,5 +1,13 @@
+import sys
+import time
+from math import isqrt
 from pycsp3 import *
 
+from sudoku_propagation import parse_puzzle, presolve, read_puzzles
+
+# parse_puzzle is re-exported for the clients of the solver (solve_server)
+__all__ = ['clues', 'parse_puzzle', 'solve_grids', 'solve_puzzles', 'solve_puzzles_cp', 'sudoku_model']
+
 # Definition of the initial sudoku grid
 clues = [[0, 2, 0, 5, 0, 1, 0, 9, 0],
          [8, 0, 0, 2, 0, 3, 0, 0, 6],
@@ -11,26 +19,128 @@ clues = [[0, 2, 0, 5, 0, 1, 0, 9, 0],
          [2, 0, 0, 8, 0, 4, 0, 0, 7],
          [0, 1, 0, 9, 0, 7, 0, 6, 0]]
 
-# x[i][j] is the value at row i and col j
-x = VarArray(size=[9, 9], dom=range(1, 10))
+def sudoku_model(n: int, n_grids: int):
+    """
+    Build the model of n_grids independent n^2 x n^2 sudokus, without clues
+    :param n: the size of a block
+    :param n_grids: the number of grids solved by a single call to the solver
+    :return: the variables, x[g][i][j] is the value at row i and col j of grid g
+    """
+    side = n * n
+    x = VarArray(size=[n_grids, side, side], dom=range(1, side + 1))
+
+    satisfy(
+        # constraints 1
+        [AllDifferent(x[g][i]) for g in range(n_grids) for i in range(side)],
+
+        # constraints 2
+        [AllDifferent(x[g][:, j]) for g in range(n_grids) for j in range(side)],
+
+        # constraints 3
+        [AllDifferent(x[g][i:i + n, j:j + n]) for g in range(n_grids)
+         for i in range(0, side, n) for j in range(0, side, n)]
+    )
+    return x
+
+
+def solve_grids(x, grids: list[list[list[int]]]) -> bool:
+    """
+    Solve the given grids at once with the model built by sudoku_model
+    The grids are assigned to the first variables of x, the remaining grids of the model stay free
+    :param x: the variables of the model
+    :param grids: the clues of at most len(x) grids
+    :return: True iff all the grids are satisfiable, the solution is then available through values(x)
+    """
+    clue_constraints = [x[g][i][j] == grid[i][j] for g, grid in enumerate(grids)
+                        for i in range(len(grid)) for j in range(len(grid)) if grid[i][j] > 0]
+    if clue_constraints:
+        satisfy(clue_constraints)
+    try:
+        return solve(solver=CHOCO) is SAT
+    finally:
+        # The clues must be removed even if the solver fails, the model is reused by the next call
+        if clue_constraints:
+            unpost()
+
+
+def solve_puzzles(puzzles: list[list[list[int]]], batch_size: int = 64,
+                  max_guesses: int = 64) -> list[(bool, list[list[int]])]:
+    """
+    Solve many puzzles of the same size
+    Each puzzle is first given to the propagation pre-solver, only the puzzles it cannot solve
+    within max_guesses guesses are completed by the CP model
+    :param puzzles: the grids of clues, all of the same size
+    :param batch_size: the number of puzzles solved by each call to the CP solver
+    :param max_guesses: the number of guesses allowed to the pre-solver for each puzzle
+    :return: a list containing a tuple (SAT, solution) for each puzzle, solution is None if SAT is False
+    """
+    results = []
+    residual_indices, residual_grids = [], []
+    for puzzle in puzzles:
+        status, grid = presolve(puzzle, max_guesses)
+        if status is None:
+            residual_indices.append(len(results))
+            residual_grids.append(grid)
+        results.append((status, grid if status else None))
+
+    for index, result in zip(residual_indices, solve_puzzles_cp(residual_grids, batch_size)):
+        results[index] = result
+    return results
 
-satisfy(
-   # constraints 1
-   [AllDifferent(x[i]) for i in range(9)],
 
-   # constraints 2
-   [AllDifferent(x[:, j]) for j in range(9)],
+def solve_puzzles_cp(puzzles: list[list[list[int]]], batch_size: int = 64) -> list[(bool, list[list[int]])]:
+    """
+    Solve many puzzles of the same size with a single model
+    The model is built once for batch_size grids, and each call to the solver solves batch_size puzzles,
+    so that the cost of starting the solver is shared by the whole batch.
+    If a batch is unsatisfiable, its puzzles are solved one by one to find the unsatisfiable ones.
+    :param puzzles: the grids of clues, all of the same size
+    :param batch_size: the number of puzzles solved by each call to the solver
+    :return: a list containing a tuple (SAT, solution) for each puzzle, solution is None if SAT is False
+    """
+    if not puzzles:
+        return []
+    side = len(puzzles[0])
+    if any(len(puzzle) != side for puzzle in puzzles):
+        raise ValueError("All the puzzles of a batch must have the same size")
+    batch_size = min(batch_size, len(puzzles))
 
-   # constraints 3
-   [AllDifferent(x[i:i + 3, j:j + 3]) for i in [0, 3, 6] for j in [0, 3, 6]],
+    # The model must be cleared even if the solver fails, pycsp3 exits when a model declares x twice
+    try:
+        x = sudoku_model(isqrt(side), batch_size)
+        results = []
+        for start in range(0, len(puzzles), batch_size):
+            batch = puzzles[start:start + batch_size]
+            if solve_grids(x, batch):
+                solutions = values(x)
+                results.extend((True, solutions[g]) for g in range(len(batch)))
+                continue
+            for puzzle in batch:
+                if solve_grids(x, [puzzle]):
+                    results.append((True, values(x)[0]))
+                else:
+                    results.append((False, None))
+    finally:
+        clear()
+    return results
 
-   # constraints 4
-   [x[i][j] == clues[i][j] for i in range(9) for j in range(9) if clues and clues[i][j] > 0]
-)
 
-# Solve the problem and print the solution if found
-if solve(solver=CHOCO) is SAT:
-    print("SATISFIABLE")
-    print(values(x))
-else:
-    print("UNSATISFIABLE")
\ No newline at end of file
+if __name__ == '__main__':
+    if len(sys.argv) == 1:
+        # Solve the problem and print the solution if found
+        status, solution = solve_puzzles([clues])[0]
+        if status:
+            print("SATISFIABLE")
+            print(solution)
+        else:
+            print("UNSATISFIABLE")
+    else:
+        puzzles = read_puzzles(sys.argv[1])
+        batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+        max_guesses = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+        start_time = time.perf_counter()
+        results = solve_puzzles(puzzles, batch_size, max_guesses)
+        elapsed = time.perf_counter() - start_time
+        n_sat = sum(1 for status, _ in results if status)
+        print("{} puzzles solved, {} unsatisfiable".format(n_sat, len(results) - n_sat))
+        print("{:.2f}s, {:.1f} puzzles per second".format(elapsed, len(results) / elapsed))
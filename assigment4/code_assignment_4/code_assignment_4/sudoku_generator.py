@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Bulk generator of n^2 x n^2 sudokus having a unique solution.
+
+Each puzzle starts from a random full grid: the diagonal blocks, which share no unit, are filled
+with random permutations and the rest of the grid is completed by the solver. The clues are then
+removed one by one in random order, a removal being kept only if the puzzle still has a unique solution.
+
+The uniqueness checks are made by a single incremental solver per process (Glucose, through
+the python-sat package), loaded once with the constraints of the sudoku.py model in the extended
+CNF encoding of sudoku_sat, the clues being passed as assumptions. The full grid is a known solution
+of every candidate puzzle, so a check is a single call: the full grid is blocked by a clause guarded
+by a fresh activation literal, the puzzle is unique iff the solver finds no other solution under this
+literal, and the activation literal is then disabled for good.
+
+Before calling the solver, the removal goes through a propagation pre-filter: the puzzle was unique
+with the clue, so it stays unique if the clue is a naked single of its cell or a hidden single of one
+of its units, as in sudoku_propagation. The values of the clues of each unit are kept in bitmasks
+updated at each removal, which makes the pre-filter much cheaper than a full propagation pass.
+
+The puzzles are generated by a process pool and written one per line in the format read by
+read_puzzles, the throughput being reported at the end.
+
+Usage: sudoku_generator.py COUNT [--block N] [--processes P] [--seed S] [--output FILE]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from pysat.solvers import Solver
+
+from sudoku_propagation import format_puzzle, get_units
+from sudoku_sat import get_clauses
+
+
+class Generator:
+
+    def __init__(self, n: int, solver_name: str = 'glucose4'):
+        """
+        Load the model of an empty n^2 x n^2 grid in an incremental solver
+        :param n: the size of a block
+        :param solver_name: the name of the python-sat solver to use
+        """
+        self.n = n
+        self.side = n * n
+        # Without clues every value of every cell has a variable: cell * side + value
+        clauses, variables = get_clauses([[0] * self.side for _ in range(self.side)], extended=True)
+        self.solver = Solver(name=solver_name, bootstrap_with=clauses)
+        self.next_var = len(variables) + 1
+        self.units, _ = get_units(self.side)
+        # The row, column and block of each cell, in the order of the units
+        self.cell_units = [(cell // self.side, self.side + cell % self.side,
+                            2 * self.side + cell // self.side // n * n + cell % self.side // n)
+                           for cell in range(self.side * self.side)]
+
+    def literal(self, cell: int, value: int) -> int:
+        return cell * self.side + value
+
+    def assumptions(self, values: list[int]) -> list[int]:
+        return [self.literal(cell, value) for cell, value in enumerate(values) if value]
+
+    def full_grid(self, rng: random.Random) -> list[int]:
+        """
+        Draw a random full grid
+        :return: the value of each cell, cells numbered row by row
+        """
+        side, n = self.side, self.n
+        values = [0] * (side * side)
+        for block in range(n):
+            digits = rng.sample(range(1, side + 1), side)
+            for k, value in enumerate(digits):
+                values[(block * n + k // n) * side + block * n + k % n] = value
+        # Filling the diagonal blocks independently never makes the grid unsatisfiable
+        self.solver.solve(assumptions=self.assumptions(values))
+        model = self.solver.get_model()
+        return [next(value for value in range(1, side + 1) if model[self.literal(cell, value) - 1] > 0)
+                for cell in range(side * side)]
+
+    def is_unique(self, values: list[int], solution: list[int]) -> bool:
+        """
+        Check that a solution is the only solution of a puzzle
+        :param values: the clues of the puzzle, 0 for an empty cell
+        :param solution: a solution of the puzzle
+        :return: True iff the puzzle has no other solution
+        """
+        blocking = [-self.literal(cell, solution[cell]) for cell, value in enumerate(values) if not value]
+        if not blocking:
+            return True
+        activation = self.next_var
+        self.next_var += 1
+        self.solver.add_clause([-activation] + blocking)
+        unique = not self.solver.solve(assumptions=self.assumptions(values) + [activation])
+        # The blocking clause is satisfied forever once its activation literal is false
+        self.solver.add_clause([-activation])
+        return unique
+
+    def is_forced(self, values: list[int], masks: list[int], cell: int, value: int) -> bool:
+        """
+        Check by propagation that a removed clue is deduced from the other clues, the puzzle
+        then keeping the unique solution it had with the clue
+        :param values: the clues of the puzzle, 0 for an empty cell
+        :param masks: the bitmask of the values of the clues of each unit
+        :param cell: the cell of the removed clue
+        :param value: the value of the removed clue
+        :return: True iff the value is a naked single of the cell or a hidden single of one of its units
+        """
+        bit = 1 << (value - 1)
+        row, col, block = self.cell_units[cell]
+        if masks[row] | masks[col] | masks[block] | bit == (1 << self.side) - 1:
+            return True
+        for unit in self.cell_units[cell]:
+            if all(values[other] or other == cell or bit & (masks[self.cell_units[other][0]]
+                                                            | masks[self.cell_units[other][1]]
+                                                            | masks[self.cell_units[other][2]])
+                   for other in self.units[unit]):
+                return True
+        return False
+
+    def generate(self, rng: random.Random) -> (list[list[int]], int, int):
+        """
+        Generate a puzzle having a unique solution, from which no clue can be removed
+        :return: a tuple (grid, n_propagation, n_solver) where n_propagation and n_solver are the numbers
+        of candidate puzzles checked by the propagation pre-filter and by the incremental solver
+        """
+        side = self.side
+        solution = self.full_grid(rng)
+        values = solution[:]
+        masks = [(1 << side) - 1] * len(self.units)
+        n_propagation = n_solver = 0
+        for cell in rng.sample(range(side * side), side * side):
+            value = values[cell]
+            values[cell] = 0
+            for unit in self.cell_units[cell]:
+                masks[unit] ^= 1 << (value - 1)
+            if self.is_forced(values, masks, cell, value):
+                n_propagation += 1
+                continue
+            n_solver += 1
+            if not self.is_unique(values, solution):
+                values[cell] = value
+                for unit in self.cell_units[cell]:
+                    masks[unit] ^= 1 << (value - 1)
+        return [values[i * side:(i + 1) * side] for i in range(side)], n_propagation, n_solver
+
+
+_generator = None
+
+
+def _init_worker(n: int):
+    """
+    Load the model in the solver of the worker process
+    """
+    global _generator
+    _generator = Generator(n)
+
+
+def _generate(seed: int) -> (str, int, int, int):
+    """
+    Generate the puzzle of a seed in the worker process
+    :return: a tuple (puzzle, n_clues, n_propagation, n_solver) where puzzle is written on a single line
+    """
+    grid, n_propagation, n_solver = _generator.generate(random.Random(seed))
+    return format_puzzle(grid), sum(1 for row in grid for value in row if value), n_propagation, n_solver
+
+
+def generate_puzzles(count: int, n: int = 3, processes: int = None, seed: int = None):
+    """
+    Generate puzzles in parallel, in the order in which they are finished
+    :param count: the number of puzzles
+    :param n: the size of a block
+    :param processes: the number of worker processes, the number of CPUs by default
+    :param seed: the seed of the first puzzle, the i-th puzzle being generated from seed + i, random by default
+    :return: a generator of tuples (puzzle, n_clues, n_propagation, n_solver), see _generate
+    """
+    processes = processes or os.cpu_count()
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    chunksize = max(1, count // (16 * processes))
+    with Pool(processes, initializer=_init_worker, initargs=(n,)) as pool:
+        yield from pool.imap_unordered(_generate, range(seed, seed + count), chunksize)
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="Generate sudokus having a unique solution")
+    parser.add_argument('count', type=int, help="the number of puzzles")
+    parser.add_argument('--block', type=int, default=3, help="the size N of a block of the N^2 x N^2 grids")
+    parser.add_argument('--processes', type=int, help="the number of worker processes")
+    parser.add_argument('--seed', type=int, help="the seed of the first puzzle")
+    parser.add_argument('--output', help="the puzzle file to write, the standard output by default")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    start_time = time.perf_counter()
+    n_clues = n_propagation = n_solver = 0
+    try:
+        for puzzle, clues, propagation, solver in generate_puzzles(args.count, args.block, args.processes,
+                                                                   args.seed):
+            print(puzzle, file=output)
+            n_clues += clues
+            n_propagation += propagation
+            n_solver += solver
+    finally:
+        if args.output:
+            output.close()
+    elapsed = time.perf_counter() - start_time
+
+    report = sys.stderr if output is sys.stdout else sys.stdout
+    print("{} puzzles generated, {:.1f} clues on average".format(args.count, n_clues / max(args.count, 1)),
+          file=report)
+    print("{} uniqueness checks, {:.1f}% answered by propagation".format(
+        n_propagation + n_solver, 100 * n_propagation / max(n_propagation + n_solver, 1)), file=report)
+    print("{:.2f}s, {:.1f} puzzles per second".format(elapsed, args.count / elapsed), file=report)
+
+
+if __name__ == '__main__':
+    main()
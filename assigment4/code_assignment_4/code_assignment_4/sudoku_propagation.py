@@ -0,0 +1,205 @@
+"""
+Constraint propagation pre-solver for n^2 x n^2 sudokus, written in pure Python.
+
+The candidates of each cell are stored in a bitmask: bit v - 1 is set iff the value v
+is still possible for the cell. Propagation applies naked singles (a cell with a single
+candidate) and hidden singles (a value with a single possible cell in a row, a column or a block)
+until a fixpoint is reached, then a small backtracking search branches on the cell with the
+fewest candidates.
+
+Most puzzles are solved by propagation alone, only the hard ones must be given to the CP model.
+The puzzle files are also read here, so that the SAT backend does not have to import pycsp3.
+"""
+
+from functools import lru_cache
+from math import isqrt
+
+# Symbols used for the values in the one-line puzzle format ('.' and '0' are empty cells)
+SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def parse_puzzle(line: str) -> list[list[int]]:
+    """
+    Parse a puzzle written on a single line
+    :param line: either n^4 characters ('.' or '0' for an empty cell, '1' to '9' then 'A' to 'Z' for the values)
+    or n^4 integers separated by whitespaces (0 for an empty cell)
+    :return: the n^2 x n^2 grid of clues where 0 is an empty cell
+    """
+    tokens = line.split()
+    if len(tokens) > 1:
+        cells = [int(token) for token in tokens]
+    else:
+        cells = [0 if c in ".0" else SYMBOLS.index(c.upper()) + 1 for c in line.strip()]
+    side = isqrt(len(cells))
+    if side * side != len(cells) or isqrt(side) ** 2 != side:
+        raise ValueError("A puzzle of", len(cells), "cells is not a n^2 x n^2 grid")
+    return [cells[i * side:(i + 1) * side] for i in range(side)]
+
+
+def format_puzzle(grid: list[list[int]]) -> str:
+    """
+    Write a puzzle on a single line, in the character format read by parse_puzzle
+    :param grid: the n^2 x n^2 grid of clues where 0 is an empty cell
+    :return: the n^4 characters of the grid, '.' for an empty cell
+    """
+    return ''.join(SYMBOLS[value - 1] if value else '.' for row in grid for value in row)
+
+
+def read_puzzles(filename: str) -> list[list[list[int]]]:
+    """
+    Read a puzzle file containing one puzzle per line (see parse_puzzle)
+    Empty lines and lines starting with '#' are ignored
+    :param filename: the path to the puzzle file
+    :return: the list of grids
+    """
+    with open(filename, 'r') as file:
+        return [parse_puzzle(line) for line in file if line.strip() and not line.startswith('#')]
+
+
+@lru_cache(maxsize=None)
+def get_units(side: int) -> (list[list[int]], list[list[int]]):
+    """
+    Compute the units and the peers of a grid, cells are numbered row by row
+    :param side: the length/width of the grid (n^2)
+    :return: a tuple (units, peers) where units contains the cells of each row, column and block
+    and peers[cell] contains the cells sharing a unit with cell
+    """
+    n = isqrt(side)
+    units = [[i * side + j for j in range(side)] for i in range(side)]
+    units += [[i * side + j for i in range(side)] for j in range(side)]
+    units += [[(bi + i) * side + bj + j for i in range(n) for j in range(n)]
+              for bi in range(0, side, n) for bj in range(0, side, n)]
+    peers = [set() for _ in range(side * side)]
+    for unit in units:
+        for cell in unit:
+            peers[cell].update(unit)
+    for cell in range(side * side):
+        peers[cell].discard(cell)
+    return units, [sorted(p) for p in peers]
+
+
+def place(values: list[int], candidates: list[int], peers: list[list[int]], cell: int, bit: int) -> bool:
+    """
+    Assign a value to a cell and remove it from the candidates of its peers
+    :param values: the value of each cell, 0 if the cell is empty
+    :param candidates: the bitmask of the candidates of each cell
+    :param peers: the peers of each cell
+    :param cell: the cell to assign
+    :param bit: the bitmask of the value to assign
+    :return: False iff a contradiction has been found
+    """
+    values[cell] = bit.bit_length()
+    candidates[cell] = bit
+    for peer in peers[cell]:
+        if candidates[peer] & bit:
+            candidates[peer] &= ~bit
+            if not candidates[peer]:
+                return False
+    return True
+
+
+def propagate(values: list[int], candidates: list[int], units: list[list[int]], peers: list[list[int]]) -> bool:
+    """
+    Apply naked and hidden singles until no more value can be deduced
+    :return: False iff a contradiction has been found
+    """
+    full = (1 << isqrt(len(values))) - 1
+    progress = True
+    while progress:
+        progress = False
+
+        # Naked singles : a cell with a single candidate
+        for cell, bits in enumerate(candidates):
+            if not values[cell] and bits & (bits - 1) == 0:
+                if not place(values, candidates, peers, cell, bits):
+                    return False
+                progress = True
+
+        # Hidden singles : a value with a single possible cell in a unit
+        for unit in units:
+            once = twice = 0
+            for cell in unit:
+                twice |= once & candidates[cell]
+                once |= candidates[cell]
+            if once != full:
+                return False
+            hidden = once & ~twice
+            if not hidden:
+                continue
+            for cell in unit:
+                single = candidates[cell] & hidden
+                if single and not values[cell]:
+                    if single & (single - 1):
+                        return False
+                    if not place(values, candidates, peers, cell, single):
+                        return False
+                    progress = True
+    return True
+
+
+def search(values: list[int], candidates: list[int], units: list[list[int]], peers: list[list[int]],
+           budget: list[int]) -> bool | None:
+    """
+    Backtracking search with propagation at each node, branching on the cell with the fewest candidates
+    The values and candidates are updated in place with the solution if one is found
+    :param budget: a one-element list containing the number of guesses still allowed
+    :return: True if a solution has been found, False if there is none, None if the budget is exhausted
+    """
+    if not propagate(values, candidates, units, peers):
+        return False
+    empty = [cell for cell in range(len(values)) if not values[cell]]
+    if not empty:
+        return True
+    cell = min(empty, key=lambda c: candidates[c].bit_count())
+
+    exhausted = False
+    bits = candidates[cell]
+    while bits:
+        bit = bits & -bits
+        bits ^= bit
+        if budget[0] <= 0:
+            return None
+        budget[0] -= 1
+        child_values, child_candidates = values[:], candidates[:]
+        if not place(child_values, child_candidates, peers, cell, bit):
+            continue
+        result = search(child_values, child_candidates, units, peers, budget)
+        if result:
+            values[:], candidates[:] = child_values, child_candidates
+            return True
+        if result is None:
+            exhausted = True
+    return None if exhausted else False
+
+
+def presolve(grid: list[list[int]], max_guesses: int = 64) -> (bool | None, list[list[int]]):
+    """
+    Try to solve a sudoku by propagation and a small backtracking search
+    :param grid: the n^2 x n^2 grid of clues where 0 is an empty cell
+    :param max_guesses: the maximum number of guesses made by the backtracking search
+    :return: a tuple (status, output) where status is True if the sudoku is solved and output is the solution,
+    False if the sudoku is unsatisfiable, and None if the search gave up, output being then the grid
+    completed with the values found by propagation, to be solved by the CP model
+    """
+    side = len(grid)
+    units, peers = get_units(side)
+    full = (1 << side) - 1
+    values = [0] * (side * side)
+    candidates = [full] * (side * side)
+
+    for i in range(side):
+        for j in range(side):
+            if grid[i][j] > 0:
+                bit = 1 << (grid[i][j] - 1)
+                cell = i * side + j
+                if not candidates[cell] & bit or not place(values, candidates, peers, cell, bit):
+                    return False, grid
+
+    if not propagate(values, candidates, units, peers):
+        return False, grid
+    residual = [values[i * side:(i + 1) * side] for i in range(side)]
+
+    status = search(values, candidates, units, peers, [max_guesses])
+    if status:
+        return True, [values[i * side:(i + 1) * side] for i in range(side)]
+    return status, residual if status is None else grid
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+SAT encoding of n^2 x n^2 sudokus, solved with the MiniSat pipeline of amazons_propositional_logic.
+
+A variable is only created for each value still possible in an empty cell: the cells of the clues
+have no variable, and the values of the clues are removed from the cells of their row, column and
+block. The minimal encoding states that each cell has at least one value and that each value
+appears at most once in each unit (row, column or block). The extended encoding adds the redundant
+clauses stating that each cell has at most one value and that each value appears at least once
+in each unit, which gives more propagation to the solver.
+
+The benchmark mode solves each puzzle set with both encodings and with the CP model of sudoku.py,
+and reports the throughput of each backend.
+
+Usage:
+sudoku_sat.py PUZZLE_FILE [--extended]
+sudoku_sat.py --benchmark PUZZLE_FILE...
+"""
+
+import os
+import sys
+import time
+from itertools import combinations
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'amazons_propositional_logic'))
+import minisat
+from solve import minisat_executable
+from sudoku_propagation import get_units, read_puzzles
+
+
+def get_clauses(grid: list[list[int]], extended: bool = False) -> (list[list[int]], list[(int, int)]):
+    """
+    Encode a sudoku in CNF, without variables for the cells and values fixed by the clues
+    :param grid: the n^2 x n^2 grid of clues where 0 is an empty cell
+    :param extended: add the redundant clauses of the extended encoding
+    :return: a tuple (clauses, variables) where variables[i] is the (cell, value) pair of the variable i + 1,
+    the cells being numbered row by row. The clauses contain an empty clause if the clues are contradictory
+    """
+    side = len(grid)
+    units, peers = get_units(side)
+    values = [value for row in grid for value in row]
+    full = (1 << side) - 1
+
+    candidates = [0] * (side * side)
+    for cell, value in enumerate(values):
+        if not value:
+            candidates[cell] = full
+            for peer in peers[cell]:
+                if values[peer]:
+                    candidates[cell] &= ~(1 << (values[peer] - 1))
+
+    # var[cell * side + value - 1] is the variable stating that the cell holds the value, 0 if there is none
+    var = [0] * (side * side * side)
+    variables = []
+    for cell, bits in enumerate(candidates):
+        for value in range(1, side + 1):
+            if bits >> (value - 1) & 1:
+                variables.append((cell, value))
+                var[cell * side + value - 1] = len(variables)
+
+    clauses = []
+    for cell, value in enumerate(values):
+        if value:
+            continue
+        cell_vars = [v for v in var[cell * side:(cell + 1) * side] if v]
+        # Each cell has at least one value
+        clauses.append(cell_vars)
+        if extended:
+            # Each cell has at most one value
+            clauses.extend([-v1, -v2] for v1, v2 in combinations(cell_vars, 2))
+
+    for unit in units:
+        given = [values[cell] for cell in unit if values[cell]]
+        if len(set(given)) != len(given):
+            # Two clues of the same unit have the same value
+            return [[]], variables
+        for value in set(range(1, side + 1)) - set(given):
+            unit_vars = [var[cell * side + value - 1] for cell in unit if var[cell * side + value - 1]]
+            # Each value appears at most once in each unit
+            clauses.extend([-v1, -v2] for v1, v2 in combinations(unit_vars, 2))
+            if extended:
+                # Each value appears at least once in each unit
+                clauses.append(unit_vars)
+    return clauses, variables
+
+
+def solve_sat(grid: list[list[int]], extended: bool = False, executable: str = None) -> (bool, list[list[int]]):
+    """
+    Solve a sudoku with MiniSat, in the current directory (the CNF files are written to ./tmp)
+    :param grid: the n^2 x n^2 grid of clues where 0 is an empty cell
+    :param extended: use the extended encoding
+    :param executable: the MiniSat executable, the one of the current platform by default
+    :return: a tuple (SAT, solution) where solution is None if SAT is False
+    """
+    side = len(grid)
+    clauses, variables = get_clauses(grid, extended)
+    if [] in clauses:
+        return False, None
+    os.makedirs('tmp', exist_ok=True)
+    is_sat, solution = minisat.minisat(len(variables), [' '.join(map(str, clause)) for clause in clauses],
+                                       executable or minisat_executable())
+    if not is_sat:
+        return False, None
+    output = [row[:] for row in grid]
+    for literal in solution:
+        cell, value = variables[literal - 1]
+        output[cell // side][cell % side] = value
+    return True, output
+
+
+def benchmark(puzzles: list[list[list[int]]], executable: str = None):
+    """
+    Solve the puzzles with each backend and print the throughput of each one
+    """
+    # pycsp3 is imported by sudoku.py, it must not see the options of this script
+    sys.argv = sys.argv[:1]
+    from sudoku import solve_puzzles_cp
+
+    backends = {
+        'SAT (minimal)': lambda: [solve_sat(puzzle, False, executable) for puzzle in puzzles],
+        'SAT (extended)': lambda: [solve_sat(puzzle, True, executable) for puzzle in puzzles],
+        'CP (Choco)': lambda: solve_puzzles_cp(puzzles),
+    }
+    reference = None
+    for name, run in backends.items():
+        start = time.perf_counter()
+        try:
+            results = run()
+        except OSError as e:
+            print("{:<15} failed: {}".format(name, e))
+            continue
+        elapsed = time.perf_counter() - start
+        statuses = [status for status, _ in results]
+        if reference is not None and statuses != reference:
+            print("{:<15} disagrees with the other backends on the satisfiability of some puzzles".format(name))
+        reference = reference or statuses
+        print("{:<15} {:.2f}s, {:.1f} puzzles per second".format(name, elapsed, len(puzzles) / elapsed))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == "--benchmark":
+        for puzzle_file in sys.argv[2:]:
+            print(puzzle_file)
+            benchmark(read_puzzles(puzzle_file))
+        exit(0)
+    if len(sys.argv) != 2 and (len(sys.argv) != 3 or sys.argv[2] != "--extended"):
+        print("Usage:", sys.argv[0], "PUZZLE_FILE [--extended]", file=sys.stderr)
+        print("      ", sys.argv[0], "--benchmark PUZZLE_FILE...", file=sys.stderr)
+        exit(1)
+
+    puzzles = read_puzzles(sys.argv[1])
+    start_time = time.perf_counter()
+    results = [solve_sat(puzzle, len(sys.argv) == 3) for puzzle in puzzles]
+    elapsed = time.perf_counter() - start_time
+    n_sat = sum(1 for status, _ in results if status)
+    print("{} puzzles solved, {} unsatisfiable".format(n_sat, len(results) - n_sat))
+    print("{:.2f}s, {:.1f} puzzles per second".format(elapsed, len(results) / elapsed))